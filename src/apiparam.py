@@ -1,21 +1,23 @@
 from PyQt5 import QtWidgets
 from PyQt5.QtCore import QSize, Qt
 from PyQt5.QtWidgets import QDialog, QMessageBox, QDialogButtonBox, QVBoxLayout, QLabel, QLineEdit, \
-    QPushButton, QFileDialog, QGroupBox, QGridLayout, QTableView, QAction, QStyle, QHBoxLayout, QSpacerItem, QSizePolicy
-from PyQt5.QtSql import QSqlDatabase, QSqlTableModel, QSqlQuery
+    QPushButton, QFileDialog, QGroupBox, QGridLayout, QTableView, QAction, QStyle, QHBoxLayout, QSpacerItem, QSizePolicy, \
+    QCheckBox
 import os
 
 
 class ApiDatabaseDialog(QDialog):
     def __init__(self):
         super().__init__()
+        from PyQt5.QtSql import QSqlDatabase, QSqlTableModel, QSqlQuery
+        from httpcache import CONFIG_FOLDER
 
         self.setMinimumSize(QSize(800, 400))
 
-        config_folder = os.path.join(os.path.expanduser("~"), '.config', 'CSV_Viewer')
-        os.makedirs(config_folder, exist_ok=True)
+        # http cache of API downloads is in the same folder
+        os.makedirs(CONFIG_FOLDER, exist_ok=True)
         db_file = "apilinks.sqlite"
-        db_path = os.path.join(config_folder, db_file)
+        db_path = os.path.join(CONFIG_FOLDER, db_file)
 
         self.db = QSqlDatabase("QSQLITE")
         self.db.setDatabaseName(db_path)
@@ -43,11 +45,15 @@ class ApiDatabaseDialog(QDialog):
 
         self.table.setModel(self.model)
         self.table.setSelectionBehavior(QtWidgets.QTableView.SelectRows)
-        self.table.setSelectionMode(QtWidgets.QTableView.SingleSelection)
+        self.table.setSelectionMode(QtWidgets.QTableView.ExtendedSelection)
         self.table.setColumnWidth(0, 750)
         self.table.selectRow(0)
         self.table.setFocus()
 
+        # links selected for import (all at once), folder for files or None - one table
+        self.links = []
+        self.folder = None
+
         self.layout = QVBoxLayout()
         QBtn = QDialogButtonBox.Ok
         self.buttonBox = QDialogButtonBox(QBtn)
@@ -64,12 +70,19 @@ class ApiDatabaseDialog(QDialog):
         self.button_del.setStatusTip("Delete api link")
         self.button_del.clicked.connect(self.del_link)
 
+        style_import = self.buttonBox.style()
+        icon = style_import.standardIcon(QStyle.SP_DialogSaveButton)
+        self.button_import = QPushButton(icon, "&Import selected")
+        self.button_import.setStatusTip("Import all selected api links at once")
+        self.button_import.clicked.connect(self.import_selected)
+
         self.buttonBox.accepted.connect(self.accept)
 
         self.layout.addWidget(self.table)
         layout_btn = QHBoxLayout()
         layout_btn.addWidget(self.button_add)
         layout_btn.addWidget(self.button_del)
+        layout_btn.addWidget(self.button_import)
         layout_btn.addSpacerItem(QSpacerItem(150, 10, QSizePolicy.Expanding))
         layout_btn.addWidget(self.buttonBox)
 
@@ -100,10 +113,37 @@ class ApiDatabaseDialog(QDialog):
             self.table.selectRow(current)
 
 
+    def import_selected(self):
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        links = [self.model.index(row, 0).data() for row in rows]
+        links = [link for link in links if link]
+        if not links:
+            QMessageBox.about(self, 'Error', 'Select api links to import.')
+            return
+
+        box = QMessageBox(QMessageBox.Question, "Import selected",
+                          f"Import {len(links)} links to separate files or to one table (with source column)?")
+        button_files = box.addButton("Separate files", QMessageBox.AcceptRole)
+        button_table = box.addButton("One table", QMessageBox.AcceptRole)
+        box.addButton(QMessageBox.Cancel)
+        box.exec_()
+        if box.clickedButton() == button_files:
+            folder = QFileDialog.getExistingDirectory(self, "Folder for CSV files")
+            if not folder:
+                return
+            self.folder = folder
+        elif box.clickedButton() != button_table:
+            return
+        self.links = links
+        self.accept()
+
+
 class ApiDialog(QDialog):
     def __init__(self):
         super().__init__()
         self.setMinimumSize(520, 200)
+        self.links = []
+        self.folder = None
         QBtn = QDialogButtonBox.Ok | QDialogButtonBox.Cancel
         self.buttonBox = QDialogButtonBox(QBtn)
         self.buttonBox.accepted.connect(self.validate)
@@ -139,6 +179,11 @@ class ApiDialog(QDialog):
         self.btn_file.clicked.connect(self.onBtnFileClicked)
         self.layout_grid.addWidget(self.btn_file, 1, 2)
 
+        # rows are shown while downloading, path is optional
+        self.direct = QCheckBox("Load directly into table (path optional)")
+        self.direct.setChecked(False)
+        self.layout_grid.addWidget(self.direct, 2, 1)
+
         self.layout.addWidget(self.buttonBox)
         self.setLayout(self.layout)
 
@@ -146,7 +191,7 @@ class ApiDialog(QDialog):
         if self.address.text() == '':
             QMessageBox.about(self, 'Error', 'API address is mandatory.')
             self.address.setFocus()
-        elif self.filename.text() == '':
+        elif self.filename.text() == '' and not self.direct.isChecked():
             QMessageBox.about(self, 'Error', 'Path to save CSV file is mandatory.')
             self.filename.setFocus()
         else:
@@ -162,5 +207,11 @@ class ApiDialog(QDialog):
         dlg = ApiDatabaseDialog()
         dlg.setWindowTitle("API database")
         if dlg.exec_():
+            if dlg.links:
+                # many links imported at once
+                self.links = dlg.links
+                self.folder = dlg.folder
+                self.accept()
+                return
             index = dlg.table.currentIndex()
             self.address.setText(dlg.model.itemData(index).get(0))
@@ -0,0 +1,40 @@
+""" parallel csv parser benchmark: time of reading generated file with 1..N processes
+
+usage: python benchmark.py [rows] [max_workers]
+"""
+import os
+import sys
+import time
+import tempfile
+import pandas as pd
+from generator import gen_int
+from parallel import read_csv_parallel
+
+
+def timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_name = os.path.join(folder, 'benchmark.csv')
+        print(f"Generating {rows} rows...")
+        gen_int(file_name, rows, 10)
+        size = os.path.getsize(file_name)
+        print(f"File size: {size / 1024 / 1024:.1f} MB")
+
+        base = timed(pd.read_csv, file_name)
+        print(f"{'pandas (c)':>12}: {base:7.2f} s")
+        for workers in range(1, max_workers + 1):
+            seconds = timed(read_csv_parallel, file_name, index=False, workers=workers,
+                            min_part_size=size // workers)
+            print(f"{workers:>3} workers: {seconds:7.2f} s  speedup: {base / seconds:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import os
+import json
+import hashlib
+import importlib.util
+
+CACHE_FOLDER = os.path.join(os.path.expanduser("~"), '.config', 'CSV_Viewer', 'cache')
+MB = 1024 * 1024
+INDEX_NAME = '__csv_viewer_index__'
+
+
+def cache_available() -> bool:
+    """ parse cache needs pyarrow (feather files), checked without importing it """
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class ParseCache:
+    """ parsed csv files stored as uncompressed feather files, keyed on path, size, mtime
+        and reading options; least recently used files are removed above max_size (bytes) """
+
+    def __init__(self, folder=CACHE_FOLDER, max_size=1024 * MB, min_file_size=MB):
+        self.folder = folder
+        self.max_size = max_size
+        self.min_file_size = min_file_size
+
+    def key(self, file_name: str, **options) -> str:
+        stat = os.stat(file_name)
+        data = {'path': os.path.abspath(file_name), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        data.update(options)
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.folder, key + '.feather')
+
+    def wanted(self, file_name: str) -> bool:
+        """ small files are parsed faster than read from cache """
+        return os.path.getsize(file_name) >= self.min_file_size
+
+    def contains(self, file_name: str, **options) -> bool:
+        return os.path.isfile(self.path(self.key(file_name, **options)))
+
+    def get(self, file_name: str, **options):
+        """ data frame from cache or None, feather file is read through memory map (no separate read
+            buffer), columns are copied into data frame by to_pandas """
+        from pyarrow import feather
+
+        path = self.path(self.key(file_name, **options))
+        if not os.path.isfile(path):
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+            df = table.to_pandas()
+        except Exception:
+            return None
+        meta = json.loads(table.schema.metadata.get(b'csv_viewer', b'{}'))
+        if df.index.name == INDEX_NAME:
+            df.index.name = meta.get('index_name')
+        # mtime of cache file - time of last use
+        os.utime(path)
+        return df
+
+    def put(self, file_name: str, df, progress=None, cancelled=None, **options) -> None:
+        """ store data frame in cache, remove least recently used files above size limit """
+        import pyarrow as pa
+        from pyarrow import feather
+
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.path(self.key(file_name, **options))
+        # index name must be str in arrow table, original name is kept in metadata
+        data = df.rename_axis(INDEX_NAME)
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b'csv_viewer'] = json.dumps({'index_name': df.index.name}, default=str).encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+
+        tmp_path = path + '.tmp'
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def files(self) -> list:
+        """ cache files as (last use, size, path), oldest first """
+        result = []
+        if os.path.isdir(self.folder):
+            for entry in os.scandir(self.folder):
+                if entry.is_file() and entry.name.endswith('.feather'):
+                    stat = entry.stat()
+                    result.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(result)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.files())
+
+    def evict(self) -> None:
+        files = self.files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        for _, _, path in self.files():
+            os.remove(path)
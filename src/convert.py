@@ -0,0 +1,153 @@
+""" headless conversion of csv files (no Qt): csv -> xlsx, sqlite, html, csv or md
+
+usage: python csv_view.py convert [options] FILES...
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sep_type = {'comma': ',', 'semicolon': ';', 'tab': '\t'}
+dec_type = {'dot': '.', 'comma': ','}
+EXTENSIONS = {'xlsx': '.xlsx', 'sqlite': '.sqlite', 'html': '.html', 'csv': '.csv', 'md': '.md'}
+
+
+def expand_inputs(patterns: list) -> list:
+    """ file names matching glob patterns (in order, without duplicates) """
+    result = []
+    for pattern in patterns:
+        names = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for name in names:
+            if name not in result:
+                result.append(name)
+    return result
+
+
+def output_name(file_name: str, file_format: str, output_dir=None, used=None) -> str:
+    """ name of converted file: input name with extension of format, in output_dir or next to input;
+        used - set of output paths already taken (inputs with the same name from different folders),
+        name is made unique (e.g. data_2.xlsx) """
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    ext = EXTENSIONS[file_format]
+    folder = output_dir or os.path.dirname(file_name)
+    name = os.path.join(folder, stem + ext)
+    number = 1
+    while used is not None and os.path.abspath(name) in used:
+        number += 1
+        name = os.path.join(folder, f"{stem}_{number}{ext}")
+    if used is not None:
+        used.add(os.path.abspath(name))
+    return name
+
+
+def without_nan(chunks):
+    """ chunks without rows with missing values """
+    for chunk in chunks:
+        yield chunk.dropna()
+
+
+def convert_file(file_name: str, file_format: str, output: str, sep=',', decimal='.', header=True, index=False,
+                 dropna=False, chunksize=100000, **kwargs) -> tuple:
+    """ convert one csv file chunk by chunk (run in worker process),
+        returns (file_name, output, rows, seconds) """
+    from loader import iter_csv_chunks
+    from export import run_export
+
+    if os.path.abspath(output) == os.path.abspath(file_name):
+        raise ValueError("Output file is the same as input file")
+    start = time.perf_counter()
+    chunks = iter_csv_chunks(file_name, sep, decimal, header, index, chunksize)
+    if dropna:
+        chunks = without_nan(chunks)
+    rows = []
+
+    def counted(items):
+        for chunk in items:
+            rows.append(chunk.shape[0])
+            yield chunk
+
+    run_export(file_format, output, counted(chunks), **kwargs)
+    return file_name, output, sum(rows), time.perf_counter() - start
+
+
+def convert_files(files: list, file_format: str, output_dir=None, workers=None, **options):
+    """ convert files in process pool, yields (file_name, output, rows, seconds, error) in order of completion """
+    from parallel import mp_context
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    used = set()
+    if workers == 1:
+        for file_name in files:
+            output = output_name(file_name, file_format, output_dir, used)
+            try:
+                yield convert_file(file_name, file_format, output, **options) + (None,)
+            except Exception as e:
+                yield file_name, output, 0, 0.0, str(e)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context()) as executor:
+        futures = {}
+        for file_name in files:
+            output = output_name(file_name, file_format, output_dir, used)
+            futures[executor.submit(convert_file, file_name, file_format, output, **options)] = (file_name, output)
+        for future in as_completed(futures):
+            try:
+                yield future.result() + (None,)
+            except Exception as e:
+                file_name, output = futures[future]
+                yield file_name, output, 0, 0.0, str(e)
+
+
+def main(argv=None) -> int:
+    """ convert command, returns exit code (1 when any file failed) """
+    parser = argparse.ArgumentParser("python csv_view.py convert")
+    parser.add_argument('files', nargs='+', help='CSV files or glob patterns')
+    parser.add_argument('-f', action='store', dest='format', required=True, choices=sorted(EXTENSIONS),
+                        help='Output format: xlsx, sqlite, html, csv or md')
+    parser.add_argument('-o', action='store', dest='output_dir', default=None,
+                        help='Output folder (default: folder of input file)')
+    parser.add_argument('-s', action='store', dest='separator', default='comma', choices=sorted(sep_type),
+                        help='Separator: comma, semicolon or tab')
+    parser.add_argument('-d', action='store', dest='decimal', default='dot', choices=sorted(dec_type),
+                        help='Decimal point: dot or comma')
+    parser.add_argument('--no-header', action='store_true', help='First row contains data')
+    parser.add_argument('--index', action='store_true', help='First column contains row labels')
+    parser.add_argument('--dropna', action='store_true', help='Remove rows with missing values')
+    parser.add_argument('--table', default='csv_data', help='Table name (sqlite format)')
+    parser.add_argument('--chunksize', type=int, default=100000, help='Rows read and written at once')
+    parser.add_argument('-j', action='store', dest='workers', type=int, default=None,
+                        help='Number of processes (default: number of CPUs)')
+    args = parser.parse_args(argv)
+
+    files = expand_inputs(args.files)
+    if not files:
+        print("No input files.", file=sys.stderr)
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    options = {'sep': sep_type[args.separator], 'decimal': dec_type[args.decimal], 'header': not args.no_header,
+               'index': args.index, 'dropna': args.dropna, 'chunksize': args.chunksize}
+    if args.format == 'sqlite':
+        options['table'] = args.table
+
+    start = time.perf_counter()
+    failed = 0
+    total_rows = 0
+    for file_name, output, rows, seconds, error in convert_files(files, args.format, args.output_dir,
+                                                                  args.workers, **options):
+        if error is None:
+            total_rows += rows
+            print(f"{file_name} -> {output}: {rows} rows, {seconds:.2f} s")
+        else:
+            failed += 1
+            print(f"{file_name}: failed: {error}", file=sys.stderr)
+    print(f"Converted {len(files) - failed} of {len(files)} files, {total_rows} rows, "
+          f"{time.perf_counter() - start:.2f} s")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
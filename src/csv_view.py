@@ -1,32 +1,69 @@
 #! /usr/bin/env python
 
 import sys
+import time
 import argparse
-from PyQt5.QtWidgets import QApplication
-from mainwindow import MainWindow
+from convert import sep_type, dec_type
 
+START_TIME = time.perf_counter()
 
-sep_type = {'comma': ',', 'semicolon': ';', 'tab': '\t'}
-dec_type = {'dot': '.', 'comma': ','}
 
-app = QApplication(sys.argv)
-window = MainWindow("CSV Viewer")
+def profile_startup(app, window) -> None:
+    """ print time to show main window and to import modules needed for data in background,
+        then quit (for tracking startup time regressions) """
+    shown = time.perf_counter() - START_TIME
+    loaded = 'pandas' in sys.modules
+    print(f"Main window shown: {shown * 1000:.0f} ms (pandas loaded: {'yes' if loaded else 'no'})")
+    window.preloadModules()
+    window.preload_thread.join()
+    print(f"Background imports finished: {(time.perf_counter() - START_TIME) * 1000:.0f} ms")
+    app.quit()
+
+
+def loader_engines() -> dict:
+    """ parser engines, loader (pandas) is imported only when file is opened from command line """
+    from loader import ENGINES
+
+    return ENGINES
+
 
 # parse command line arguments if present
 if __name__ == '__main__':
+    # headless conversion, without Qt
+    if len(sys.argv) > 1 and sys.argv[1] == 'convert':
+        import convert
+        sys.exit(convert.main(sys.argv[2:]))
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from mainwindow import MainWindow
+
+    # application is created only when run as script (worker processes import this module)
+    app = QApplication(sys.argv)
+    window = MainWindow("CSV Viewer")
+
     if len(sys.argv) > 1:
         parser = argparse.ArgumentParser("python csv_viewer.py")
-        parser.add_argument('-p', action='store', dest='path', required=True,
+        parser.add_argument('-p', action='store', dest='path', required=False,
                             help='Path to CSV file')
-        parser.add_argument('-s', action='store', dest='separator', required=True,
+        parser.add_argument('-s', action='store', dest='separator', required=False,
                             help='Separator: comma, semicolon or tab')
         parser.add_argument('-d', action='store', dest='decimal', required=False,
                             help='Decimal point: dot or comma')
+        parser.add_argument('-e', action='store', dest='engine', required=False,
+                            default=window.settings.value('engine', 'c'),
+                            help='Parser engine: c, pyarrow or parallel')
+        parser.add_argument('--profile-startup', action='store_true',
+                            help='Print startup time and quit')
         results = parser.parse_args()
-        if results.path != "" and results.separator in sep_type and results.decimal in dec_type:
+        if results.profile_startup:
+            QTimer.singleShot(0, lambda: profile_startup(app, window))
+        elif results.path and results.separator in sep_type and results.decimal in dec_type \
+                and results.engine in loader_engines():
             window.open_csv_file(results.path,
                                  sep_type[results.separator],
-                                 dec_type[results.decimal])
+                                 dec_type[results.decimal],
+                                 engine=results.engine)
         else:
             print("Invalid parameters. Run csv_view with -h option to help.")
 
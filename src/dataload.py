@@ -4,13 +4,27 @@
 # csv = comma separated file
 # ISO code, POL = Poland
 
+import io
+import os
+import time
+import tempfile
+import contextlib
 import requests
 
+# connect and read timeout (seconds)
+TIMEOUT = (5, 30)
+# http statuses worth another attempt
+RETRY_STATUS = {429, 500, 502, 503, 504}
 
-def import_data_by_api(address: str):
+
+class DownloadError(Exception):
+    """ download failed (after all retries) """
+
+
+def import_data_by_api(address: str, timeout=TIMEOUT):
 
     try:
-        resp = requests.get(address)
+        resp = requests.get(address, timeout=timeout)
         resp.raise_for_status()
     except requests.exceptions.HTTPError as errh:
         return False, "Http Error: " + str(errh)
@@ -22,3 +36,304 @@ def import_data_by_api(address: str):
         return False, "Error: " + str(err)
 
     return True, resp.text
+
+
+def _wait(seconds: float, cancelled=None) -> None:
+    """ sleep between attempts, interrupted when download is cancelled """
+    from loader import CancelledError
+
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        if cancelled is not None and cancelled():
+            raise CancelledError()
+        time.sleep(min(0.1, max(0.0, end - time.monotonic())))
+
+
+def _retrying(attempt_fn, retries=3, backoff=0.5, cancelled=None):
+    """ call attempt_fn, connection errors, timeouts and 429/5xx responses are retried with exponential
+        backoff, other errors (and the last one) are raised as DownloadError """
+    for attempt in range(retries + 1):
+        try:
+            return attempt_fn()
+        except requests.exceptions.HTTPError as errh:
+            if errh.response is None or errh.response.status_code not in RETRY_STATUS or attempt == retries:
+                raise DownloadError("Http Error: " + str(errh))
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as errc:
+            if attempt == retries:
+                raise DownloadError("Error Connecting: " + str(errc))
+        except requests.exceptions.Timeout as errt:
+            if attempt == retries:
+                raise DownloadError("Timeout Error: " + str(errt))
+        except requests.exceptions.RequestException as err:
+            raise DownloadError("Error: " + str(err))
+        _wait(backoff * 2 ** attempt, cancelled)
+
+
+def _fetch(session, address: str, f, timeout, chunk_size: int, progress=None, cancelled=None, headers=None):
+    """ one attempt: stream response body to file object, returns (number of bytes, response headers),
+        number of bytes is None for 304 Not Modified """
+    from loader import CancelledError
+
+    with session.get(address, stream=True, timeout=timeout, headers=headers) as resp:
+        if resp.status_code == 304:
+            return None, resp.headers
+        resp.raise_for_status()
+        total = int(resp.headers.get('Content-Length', 0) or 0)
+        size = 0
+        f.seek(0)
+        f.truncate()
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            if cancelled is not None and cancelled():
+                raise CancelledError()
+            f.write(chunk)
+            size += len(chunk)
+            if progress is not None and total > 0:
+                progress(min(100, int(100 * size / total)))
+    return size, resp.headers
+
+
+def fetch(address: str, f, timeout=TIMEOUT, retries=3, backoff=0.5, chunk_size=1 << 16, session=None,
+          cache=None, progress=None, cancelled=None, message=None) -> int:
+    """ stream response body to binary file object (readable when cache is used), connection errors,
+        timeouts and 429/5xx responses are retried with exponential backoff; cache - HttpCache, fresh
+        response is taken from cache, older one is revalidated (conditional GET); cache hit or miss
+        is reported by message; returns number of bytes """
+    entry = cache.lookup(address) if cache is not None else None
+    if entry is not None and cache.fresh(entry):
+        if message is not None:
+            message(f"HTTP cache hit: {address}")
+        return cache.read(address, f)
+
+    session = session or requests.Session()
+    headers = cache.validators(entry) if entry is not None else None
+    size, response_headers = _retrying(
+        lambda: _fetch(session, address, f, timeout, chunk_size, progress, cancelled, headers),
+        retries, backoff, cancelled)
+
+    if size is None:
+        # 304 Not Modified
+        if entry is None:
+            raise DownloadError(f"Not modified response without cached copy: {address}")
+        cache.refresh(address, entry, response_headers)
+        if message is not None:
+            message(f"HTTP cache hit (not modified): {address}")
+        return cache.read(address, f)
+    if cache is not None:
+        cache.store(address, f, response_headers)
+        f.seek(0, os.SEEK_END)
+        if message is not None:
+            message(f"HTTP cache miss: {address}")
+    return size
+
+
+def download(address: str, file_name: str, progress=None, cancelled=None, **kwargs) -> str:
+    """ download address to file, body is streamed to disk (progress from Content-Length),
+        partial file is removed when download fails or is cancelled; kwargs - options of fetch;
+        returns file_name """
+    part = file_name + '.part'
+    try:
+        with open(part, 'w+b') as f:
+            fetch(address, f, progress=progress, cancelled=cancelled, **kwargs)
+        os.replace(part, file_name)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+    return file_name
+
+
+def _open_stream(session, address: str, timeout, headers=None):
+    """ response with status checked (304 Not Modified passes), body not read yet """
+    resp = session.get(address, stream=True, timeout=timeout, headers=headers)
+    try:
+        resp.raise_for_status()
+    except requests.exceptions.HTTPError:
+        resp.close()
+        raise
+    return resp
+
+
+class _TeeReader:
+    """ file object passing bytes read from response (or cached body) to the parser and copying them
+        to files (None - not copied), bytes read are counted for progress """
+
+    def __init__(self, raw, *files):
+        self.raw = raw
+        self.files = [f for f in files if f is not None]
+        self.size = 0
+
+    def read(self, size=-1) -> bytes:
+        data = self.raw.read(size)
+        self.size += len(data)
+        for f in self.files:
+            f.write(data)
+        return data
+
+
+def read_csv_stream(address: str, file_name=None, chunk_rows=50000, timeout=TIMEOUT, retries=3, backoff=0.5,
+                    session=None, cache=None, progress=None, cancelled=None, frame_ready=None, message=None):
+    """ parse csv response while it is downloaded (no temporary file round-trip), every chunk_rows
+        parsed rows are passed to frame_ready as data frame; file_name - optional copy of response
+        saved on the way (removed when loading fails); cache - HttpCache, fresh or not modified
+        (conditional GET) response is parsed from cache, new response is stored in cache on the way,
+        cache hit or miss is reported by message; returns the whole data frame """
+    import pandas as pd
+    from loader import CancelledError
+
+    entry = cache.lookup(address) if cache is not None else None
+    resp = None
+    if entry is not None and cache.fresh(entry):
+        if message is not None:
+            message(f"HTTP cache hit: {address}")
+    else:
+        session = session or requests.Session()
+        headers = cache.validators(entry) if entry is not None else None
+        resp = _retrying(lambda: _open_stream(session, address, timeout, headers), retries, backoff, cancelled)
+        if resp.status_code == 304:
+            resp.close()
+            if entry is None:
+                raise DownloadError(f"Not modified response without cached copy: {address}")
+            cache.refresh(address, entry, resp.headers)
+            resp = None
+            if message is not None:
+                message(f"HTTP cache hit (not modified): {address}")
+    part = file_name + '.part' if file_name else None
+    chunks = []
+    try:
+        with contextlib.ExitStack() as stack:
+            if resp is None:
+                raw = stack.enter_context(cache.open(address))
+                total = os.fstat(raw.fileno()).st_size
+                body = None
+            else:
+                stack.enter_context(resp)
+                raw = resp.raw
+                raw.decode_content = True
+                total = int(resp.headers.get('Content-Length', 0) or 0)
+                # copy of response stored in cache when parsed completely
+                body = stack.enter_context(tempfile.TemporaryFile()) if cache is not None else None
+            f = stack.enter_context(open(part, 'wb')) if part else None
+            reader = _TeeReader(raw, f, body)
+            try:
+                with pd.read_csv(reader, chunksize=chunk_rows) as frames:
+                    for chunk in frames:
+                        if cancelled is not None and cancelled():
+                            raise CancelledError()
+                        chunks.append(chunk)
+                        if frame_ready is not None:
+                            frame_ready(chunk)
+                        if progress is not None and total > 0:
+                            progress(min(100, int(100 * reader.size / total)))
+            except pd.errors.EmptyDataError:
+                pass
+            except requests.exceptions.RequestException as err:
+                raise DownloadError("Error: " + str(err))
+            if body is not None:
+                cache.store(address, body, resp.headers)
+                if message is not None:
+                    message(f"HTTP cache miss: {address}")
+        if part:
+            os.replace(part, file_name)
+    finally:
+        if part and os.path.exists(part):
+            os.remove(part)
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def pooled_session(connections=8):
+    """ session with pool of keep-alive connections shared by threads """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=connections, pool_maxsize=connections)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def link_file_name(address: str, folder: str, used: set) -> str:
+    """ file name in folder for downloaded link: last part of url path, made unique """
+    from urllib.parse import urlsplit
+
+    base = os.path.basename(urlsplit(address).path) or 'data.csv'
+    base = "".join(char if char.isalnum() or char in '._-' else '_' for char in base)
+    stem, ext = os.path.splitext(base)
+    name = base
+    number = 1
+    while name in used:
+        number += 1
+        name = f"{stem}_{number}{ext or '.csv'}"
+    used.add(name)
+    return os.path.join(folder, name)
+
+
+def _fetch_link(session, address: str, output, cancelled=None, **kwargs) -> tuple:
+    """ download one link to file (output - file name) or parse it into data frame with source column
+        (output None); returns (address, file name or data frame, seconds, bytes, error) """
+    from loader import CancelledError
+
+    start = time.perf_counter()
+    try:
+        if output is not None:
+            download(address, output, session=session, cancelled=cancelled, **kwargs)
+            size = os.path.getsize(output)
+            result = output
+        else:
+            import pandas as pd
+
+            buffer = io.BytesIO()
+            size = fetch(address, buffer, session=session, cancelled=cancelled, **kwargs)
+            buffer.seek(0)
+            result = pd.read_csv(buffer)
+            result.insert(0, 'source', address)
+    except CancelledError:
+        raise
+    except Exception as e:
+        return address, None, time.perf_counter() - start, 0, str(e)
+    return address, result, time.perf_counter() - start, size, None
+
+
+def fetch_many(addresses: list, folder=None, connections=8, progress=None, cancelled=None, **kwargs) -> tuple:
+    """ import many links at once (threads with one pooled session): to files in folder or, when folder
+        is None, into one data frame with source column; returns (list of (address, file name,
+        seconds, bytes, error), data frame or None) """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    used = set()
+    outputs = [link_file_name(address, folder, used) if folder else None for address in addresses]
+    results = {}
+    # connections are closed also when import fails or is cancelled
+    with pooled_session(connections) as session, ThreadPoolExecutor(max_workers=connections) as executor:
+        futures = {executor.submit(_fetch_link, session, address, output, cancelled=cancelled, **kwargs): number
+                   for number, (address, output) in enumerate(zip(addresses, outputs))}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if progress is not None:
+                    progress(int(100 * len(results) / len(addresses)))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    results = [results[number] for number in range(len(addresses))]
+
+    df = None
+    if folder is None:
+        import pandas as pd
+
+        frames = [result for _, result, _, _, error in results if error is None]
+        df = pd.concat(frames, ignore_index=True) if frames else None
+        results = [(address, None, seconds, size, error) for address, _, seconds, size, error in results]
+    return results, df
+
+
+def import_report(results: list) -> str:
+    """ latency and size of every link, failures """
+    lines = []
+    for address, _, seconds, size, error in results:
+        if error is None:
+            lines.append(f"{address}: {seconds:.2f} s, {size / 1024:.1f} KB")
+        else:
+            lines.append(f"{address}: failed: {error}")
+    failed = sum(1 for *_, error in results if error is not None)
+    lines.append(f"Imported {len(results) - failed} of {len(results)} links.")
+    return "\n".join(lines)
@@ -0,0 +1,271 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from loader import CancelledError
+
+XLSX_MAX_ROWS = 1048576
+
+
+class ExportProgress:
+    """ progress (0-100) and throughput of rows written, reported at most every interval seconds,
+        and cancel check """
+
+    def __init__(self, total=None, progress=None, cancelled=None, message=None, interval=0.2):
+        self.total = total
+        self.progress = progress
+        self.cancelled = cancelled
+        self.message = message
+        self.interval = interval
+        self.rows = 0
+        self._start = self._last = time.monotonic()
+
+    def check(self) -> None:
+        """ raise CancelledError when user cancelled export """
+        if self.cancelled is not None and self.cancelled():
+            raise CancelledError()
+
+    def update(self, rows: int) -> None:
+        self.rows += rows
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            if self.progress is not None and self.total:
+                self.progress(min(100, int(100 * self.rows / self.total)))
+            if self.message is not None:
+                self.message(f"Exported rows: {self.rows} ({self.rows_per_second():.0f} rows/s)")
+
+    def rows_per_second(self) -> float:
+        elapsed = time.monotonic() - self._start
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def finish(self) -> None:
+        if self.message is not None:
+            self.message(f"Exported rows: {self.rows} ({self.rows_per_second():.0f} rows/s)")
+
+
+def export_csv(file_name: str, chunks, total=None, progress=None, cancelled=None, message=None) -> None:
+    """ export chunks of data frame to CSV file """
+    reporter = ExportProgress(total, progress, cancelled, message)
+    with open(file_name, 'w', newline='', buffering=1 << 20) as f:
+        first = True
+        for chunk in chunks:
+            reporter.check()
+            chunk.to_csv(f, sep=',', decimal='.', header=first)
+            first = False
+            reporter.update(chunk.shape[0])
+    reporter.finish()
+
+
+def export_html(file_name: str, chunks, total=None, progress=None, cancelled=None, message=None) -> None:
+    """ export chunks of data frame to one HTML table """
+    reporter = ExportProgress(total, progress, cancelled, message)
+    with open(file_name, 'w', buffering=1 << 20) as f:
+        first = True
+        tail = ''
+        for chunk in chunks:
+            reporter.check()
+            html = chunk.to_html()
+            body_start = html.index('<tbody>') + len('<tbody>')
+            body_end = html.rindex('</tbody>')
+            if first:
+                f.write(html[:body_end])
+                tail = html[body_end:]
+                first = False
+            else:
+                f.write(html[body_start:body_end])
+            reporter.update(chunk.shape[0])
+        f.write(tail)
+    reporter.finish()
+
+
+def export_xlsx(file_name: str, chunks, total=None, progress=None, cancelled=None, message=None) -> None:
+    """ export chunks of data frame to xlsx file, rows are written in order with constant memory """
+    import xlsxwriter
+
+    if total is not None and total >= XLSX_MAX_ROWS:
+        raise ValueError(f"Too many rows for xlsx file: {total}")
+
+    reporter = ExportProgress(total, progress, cancelled, message)
+    # inf is written as error cell #DIV/0! (xlsx has no infinity)
+    workbook = xlsxwriter.Workbook(file_name, {'constant_memory': True, 'nan_inf_to_errors': True})
+    worksheet = workbook.add_worksheet()
+    bold = workbook.add_format({'bold': True})
+    row_num = 0
+    try:
+        for chunk in chunks:
+            reporter.check()
+            if row_num == 0:
+                worksheet.write_row(0, 0, [chunk.index.name] + [str(col) for col in chunk.columns], bold)
+                row_num = 1
+            if row_num + chunk.shape[0] > XLSX_MAX_ROWS:
+                raise ValueError("Too many rows for xlsx file")
+            # missing values and row labels as empty cells
+            values = chunk.astype(object).where(chunk.notna(), None)
+            labels = chunk.index.to_numpy(dtype=object)
+            labels[pd.isna(labels)] = None
+            for label, row in zip(labels, values.itertuples(index=False)):
+                worksheet.write_row(row_num, 0, [label] + list(row))
+                row_num += 1
+            reporter.update(chunk.shape[0])
+    finally:
+        workbook.close()
+    reporter.finish()
+
+
+def _sql_type(dtype) -> str:
+    """ SQLite column type for pandas dtype """
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+def _sql_name(name) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_values(values) -> list:
+    """ column (Series or Index) as list of python values accepted by sqlite3, missing values as None """
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iufb':
+        # NaN is stored as NULL by SQLite
+        return values.tolist()
+    missing = np.asarray(values.isna())
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
+        result = values.to_numpy(dtype=object)
+    else:
+        # dates, categories... as text
+        result = values.astype(str).to_numpy(dtype=object)
+    result[missing] = None
+    return result.tolist()
+
+
+def _sql_rows(chunk) -> list:
+    """ rows of chunk (row label first) as list of tuples """
+    columns = [_sql_values(chunk.index)] + [_sql_values(chunk.iloc[:, i]) for i in range(chunk.shape[1])]
+    return list(zip(*columns))
+
+
+def export_sqlite(file_name: str, chunks, total=None, progress=None, cancelled=None, message=None,
+                  table='csv_data', if_exists='fail', batch_size=50000) -> None:
+    """ export chunks of data frame to table in SQLite database, all rows are inserted with executemany
+        in one transaction, journal and sync are switched off during load (database created here,
+        existing one uses WAL) and restored after load, index on row labels is created after load;
+        if_exists: fail, replace or append """
+    import sqlite3
+
+    reporter = ExportProgress(total, progress, cancelled, message)
+    created = not os.path.exists(file_name)
+    con = sqlite3.connect(file_name, isolation_level=None)
+    journal_mode = synchronous = None
+    try:
+        # settings of existing database are restored after load
+        journal_mode = con.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = con.execute("PRAGMA synchronous").fetchone()[0]
+        con.execute("PRAGMA journal_mode=OFF" if created else "PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=OFF")
+        con.execute("BEGIN")
+        exists = con.execute("SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?",
+                             (table,)).fetchone()[0] > 0
+        if exists and if_exists == 'fail':
+            raise ValueError(f"Table '{table}' already exists.")
+        if exists and if_exists == 'replace':
+            con.execute(f"DROP TABLE {_sql_name(table)}")
+            exists = False
+
+        insert = None
+        index_name = 'index'
+        for chunk in chunks:
+            reporter.check()
+            if insert is None:
+                index_name = chunk.index.name if chunk.index.name is not None else 'index'
+                columns = [(index_name, chunk.index.dtype)] + list(zip(chunk.columns, chunk.dtypes))
+                if not exists:
+                    fields = ", ".join(f"{_sql_name(name)} {_sql_type(dtype)}" for name, dtype in columns)
+                    con.execute(f"CREATE TABLE {_sql_name(table)} ({fields})")
+                placeholders = ", ".join("?" * len(columns))
+                insert = f"INSERT INTO {_sql_name(table)} VALUES ({placeholders})"
+
+            for start in range(0, chunk.shape[0], batch_size):
+                reporter.check()
+                batch = _sql_rows(chunk.iloc[start:start + batch_size])
+                con.executemany(insert, batch)
+                reporter.update(len(batch))
+
+        if insert is not None and not exists:
+            con.execute(f"CREATE INDEX {_sql_name('ix_' + table + '_' + str(index_name))} "
+                        f"ON {_sql_name(table)} ({_sql_name(index_name)})")
+        con.execute("COMMIT")
+    except BaseException:
+        if con.in_transaction:
+            con.execute("ROLLBACK")
+        raise
+    finally:
+        if synchronous is not None:
+            con.execute(f"PRAGMA synchronous={int(synchronous)}")
+        if journal_mode is not None:
+            con.execute(f"PRAGMA journal_mode={journal_mode}")
+        con.close()
+    reporter.finish()
+
+
+def _markdown_lines(chunk) -> str:
+    """ rows of chunk as markdown table lines, built with vectorized string operations """
+    # str() of every value, as numpy unicode arrays
+    cells = [pd.Series(chunk.index.to_numpy(dtype=object).astype(str), dtype=object)]
+    for i in range(chunk.shape[1]):
+        cells.append(pd.Series(chunk.iloc[:, i].to_numpy(dtype=object).astype(str), dtype=object))
+    lines = cells[0].str.cat(cells[1:], sep=" | ")
+    return "".join(" | " + lines + " | \n")
+
+
+def export_markdown(file_name: str, chunks, total=None, progress=None, cancelled=None, message=None) -> None:
+    """ export chunks of data frame to markdown table, numeric columns are right-aligned """
+    reporter = ExportProgress(total, progress, cancelled, message)
+    with open(file_name, 'w', buffering=1 << 20) as f:
+        # title
+        f.write("***Table***\n\n")
+
+        first = True
+        for chunk in chunks:
+            reporter.check()
+
+            # header line, first column - row labels
+            if first:
+                first = False
+                headers = [chunk.index.name if chunk.index.name is not None else ''] + list(chunk.columns.values)
+                numeric = [pd.api.types.is_numeric_dtype(chunk.index.dtype)]
+                numeric += [pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+                            for dtype in chunk.dtypes]
+                f.write(" | " + " | ".join(str(item) for item in headers) + " | \n")
+                f.write("|" + "".join("---:|" if item else "---|" for item in numeric) + "\n")
+
+            if chunk.shape[0] > 0:
+                f.write(_markdown_lines(chunk))
+            reporter.update(chunk.shape[0])
+    reporter.finish()
+
+
+EXPORTERS = {
+    'xlsx': export_xlsx,
+    'sqlite': export_sqlite,
+    'html': export_html,
+    'csv': export_csv,
+    'md': export_markdown,
+}
+
+
+def run_export(file_format: str, file_name: str, chunks, total=None, progress=None, cancelled=None, **kwargs):
+    """ export data to file in given format (key of EXPORTERS), partial file is removed
+        when export is cancelled or fails (existing SQLite database is rolled back instead),
+        returns file_name """
+    existed = os.path.exists(file_name)
+    try:
+        EXPORTERS[file_format](file_name, chunks, total=total, progress=progress, cancelled=cancelled, **kwargs)
+    except BaseException:
+        if os.path.exists(file_name) and not (existed and file_format == 'sqlite'):
+            os.remove(file_name)
+        raise
+    return file_name
@@ -2,17 +2,20 @@ import os
 from PyQt5 import QtCore
 from PyQt5.QtGui import QFont
 from PyQt5.QtWidgets import QDialog, QMessageBox, QDialogButtonBox, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, \
-    QPushButton, QRadioButton, QFileDialog, QGroupBox, QPlainTextEdit, QCheckBox
+    QPushButton, QRadioButton, QFileDialog, QGroupBox, QPlainTextEdit, QCheckBox, QComboBox
 
 
 class ParameterDialog(QDialog):
-    def __init__(self, file_name='', sep=',', decimal='.', header=True, index=False):
+    def __init__(self, file_name='', sep=',', decimal='.', header=True, index=False, lazy=False, compact=False, engine='c'):
         super().__init__()
         self.setMinimumSize(520, 200)
         self.separator = sep
         self.decimal = decimal
         self.header = header
         self.index = index
+        self.lazy = lazy
+        self.compact = compact
+        self.engine = engine
         QBtn = QDialogButtonBox.Ok | QDialogButtonBox.Cancel
         self.buttonBox = QDialogButtonBox(QBtn)
         self.buttonBox.accepted.connect(self.validate)
@@ -108,6 +111,35 @@ class ParameterDialog(QDialog):
         self.layout_header.addWidget(self.chk_index)
         self.chk_index.stateChanged.connect(self.onClickedIndex)
 
+        # loading mode
+        groupbox_load = QGroupBox("Loading:")
+        self.layout.addWidget(groupbox_load)
+        self.layout_load = QVBoxLayout()
+        groupbox_load.setLayout(self.layout_load)
+
+        self.chk_lazy = QCheckBox("Read rows from disk on demand (large files)")
+        self.chk_lazy.setChecked(self.lazy)
+        self.layout_load.addWidget(self.chk_lazy)
+        self.chk_lazy.stateChanged.connect(self.onClickedLazy)
+
+        self.chk_compact = QCheckBox("Compact memory (narrow numeric types, low cardinality text as categories)")
+        self.chk_compact.setChecked(self.compact)
+        self.layout_load.addWidget(self.chk_compact)
+        self.chk_compact.stateChanged.connect(self.onClickedCompact)
+
+        self.layout_engine = QHBoxLayout()
+        self.layout_engine.addWidget(QLabel("Parser:"))
+        from loader import ENGINES
+
+        self.combo_engine = QComboBox()
+        for key, text in ENGINES.items():
+            self.combo_engine.addItem(text, key)
+        self.combo_engine.setCurrentIndex(max(0, self.combo_engine.findData(engine)))
+        self.combo_engine.currentIndexChanged.connect(self.onEngineChanged)
+        self.layout_engine.addWidget(self.combo_engine)
+        self.layout_engine.addStretch()
+        self.layout_load.addLayout(self.layout_engine)
+
         # preview csv file
         groupbox_pre = QGroupBox("Preview:")
         self.layout.addWidget(groupbox_pre)
@@ -162,6 +194,21 @@ class ParameterDialog(QDialog):
         else:
             self.index = False
 
+    def onClickedLazy(self, state):
+        if state == QtCore.Qt.Checked:
+            self.lazy = True
+        else:
+            self.lazy = False
+
+    def onClickedCompact(self, state):
+        if state == QtCore.Qt.Checked:
+            self.compact = True
+        else:
+            self.compact = False
+
+    def onEngineChanged(self, index):
+        self.engine = self.combo_engine.itemData(index)
+
     def onBtnFileClicked(self):
         file_name, _ = QFileDialog.getOpenFileName(
             self, "Open CSV file...", "", "CSV (*.csv);;All Files (*)")
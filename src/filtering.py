@@ -0,0 +1,65 @@
+import importlib.util
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+def numexpr_available() -> bool:
+    return importlib.util.find_spec('numexpr') is not None
+
+
+def filter_mask(df, expression: str, progress=None, cancelled=None):
+    """ boolean array - rows matching filter expression (syntax of DataFrame.query, e.g.
+        col_3 > 50 and col_7.isna()), evaluated with numexpr when installed, expressions not
+        supported by numexpr (e.g. method calls) with python engine """
+    from loader import CancelledError
+
+    result = None
+    if numexpr_available():
+        try:
+            result = df.eval(expression, engine='numexpr')
+        except (NotImplementedError, TypeError, ValueError):
+            result = None
+    if result is None:
+        result = df.eval(expression, engine='python')
+    if cancelled is not None and cancelled():
+        raise CancelledError()
+    if not isinstance(result, pd.Series) or not pd.api.types.is_bool_dtype(result.dtype):
+        raise ValueError(f"Filter is not a condition (True/False for every row): {expression}")
+    if progress is not None:
+        progress(100)
+    return result.to_numpy(dtype=bool, na_value=False)
+
+
+def view_rows(mask=None, order=None):
+    """ positions of data rows shown in view: sort permutation (order) without rows excluded by filter
+        (mask), None - all rows in data order """
+    if mask is None:
+        return order
+    if order is None:
+        return np.flatnonzero(mask)
+    return order[mask[order]]
+
+
+class MaskCache:
+    """ masks of recently used filters of current data (expression: boolean array), least recently
+        used are removed above max_items """
+
+    def __init__(self, max_items=16):
+        self.max_items = max_items
+        self._masks = OrderedDict()
+
+    def get(self, expression: str):
+        mask = self._masks.get(expression)
+        if mask is not None:
+            self._masks.move_to_end(expression)
+        return mask
+
+    def put(self, expression: str, mask) -> None:
+        self._masks[expression] = mask
+        self._masks.move_to_end(expression)
+        while len(self._masks) > self.max_items:
+            self._masks.popitem(last=False)
+
+    def clear(self) -> None:
+        self._masks.clear()
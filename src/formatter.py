@@ -0,0 +1,156 @@
+from bisect import bisect_right
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+class ColumnFormatter:
+    """ column-wise cell formatting for TableModel, formatted row blocks are kept in LRU cache;
+        rows are rows of view (mapped to data rows when set_rows was called) """
+
+    def __init__(self, data, round_num: int, block_size=256, max_blocks=1024):
+        self._data = data
+        self.round_num = round_num
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self._cache = OrderedDict()
+        self._values = []
+        self._numeric = []
+        self._nan = None
+        self._rows = None
+        self.invalidate()
+
+    def invalidate(self, round_num=None) -> None:
+        """ clear formatted blocks, recompute dtype kinds and NaN masks (after data change) """
+        if round_num is not None:
+            self.round_num = round_num
+        self._cache.clear()
+        self._values = []
+        self._numeric = []
+        for col in range(self._data.shape[1]):
+            series = self._data.iloc[:, col]
+            numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+            if numeric and not isinstance(series.dtype, np.dtype):
+                # nullable extension types (Int8, Float32...) - NA as NaN
+                values = series.to_numpy(dtype='float64', na_value=np.nan)
+            else:
+                values = series.to_numpy()
+            self._values.append(values)
+            self._numeric.append(numeric)
+        self._nan = self._data.isna().to_numpy()
+
+    def clear(self, round_num=None) -> None:
+        """ clear only formatted blocks (e.g. round_num change) """
+        if round_num is not None:
+            self.round_num = round_num
+        self._cache.clear()
+
+    def set_rows(self, rows) -> None:
+        """ positions of data rows shown in view (e.g. sort permutation), None - all rows in data order """
+        self._rows = rows
+        self._cache.clear()
+
+    def data_row(self, row: int) -> int:
+        """ position in data of row of view """
+        return row if self._rows is None else int(self._rows[row])
+
+    def row_count(self) -> int:
+        """ number of data rows """
+        return self._data.shape[0]
+
+    def label(self, row: int):
+        """ index label of row of view """
+        return self._data.index[self.data_row(row)]
+
+    def nan_mask(self):
+        """ missing values of data (data rows x columns) """
+        return self._nan
+
+    def is_numeric(self, col: int) -> bool:
+        return self._numeric[col]
+
+    def is_nan(self, row: int, col: int) -> bool:
+        return bool(self._nan[self.data_row(row), col])
+
+    def text(self, row: int, col: int) -> str:
+        """ formatted value of cell """
+        block_no, offset = divmod(row, self.block_size)
+        key = (col, block_no)
+        block = self._cache.get(key)
+        if block is None:
+            block = self._format_block(col, block_no)
+            self._cache[key] = block
+            if len(self._cache) > self.max_blocks:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return block[offset]
+
+    def format_rows(self, col: int, start: int, stop: int) -> list:
+        """ format rows [start, stop) of column in one vectorized call """
+        if self._rows is None:
+            values = self._values[col][start:stop]
+        else:
+            values = self._values[col][self._rows[start:stop]]
+        if self._numeric[col]:
+            # str.format of python floats - the same text as np.char.mod, about twice as fast
+            return list(map(f"{{:.{self.round_num}f}}".format, values.tolist()))
+        return [str(value) for value in values]
+
+    def _format_block(self, col: int, block_no: int) -> list:
+        start = block_no * self.block_size
+        return self.format_rows(col, start, start + self.block_size)
+
+
+class ChunkedFormatter:
+    """ formatting of data arriving in chunks (streaming), every chunk has its own ColumnFormatter,
+        so appended rows are the only ones converted and checked for NaN """
+
+    def __init__(self, chunks, round_num: int):
+        self.round_num = round_num
+        self._formatters = []
+        self._starts = []
+        self._count = 0
+        for chunk in chunks:
+            self.append(chunk)
+
+    def append(self, chunk) -> None:
+        self._formatters.append(ColumnFormatter(chunk, self.round_num))
+        self._starts.append(self._count)
+        self._count += chunk.shape[0]
+
+    def frame(self):
+        """ all chunks as one data frame """
+        frames = [formatter._data for formatter in self._formatters]
+        return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+    def _locate(self, row: int) -> tuple:
+        number = bisect_right(self._starts, row) - 1
+        return self._formatters[number], row - self._starts[number]
+
+    def row_count(self) -> int:
+        return self._count
+
+    def data_row(self, row: int) -> int:
+        return row
+
+    def label(self, row: int):
+        formatter, offset = self._locate(row)
+        return formatter.label(offset)
+
+    def clear(self, round_num=None) -> None:
+        if round_num is not None:
+            self.round_num = round_num
+        for formatter in self._formatters:
+            formatter.clear(round_num)
+
+    def is_numeric(self, col: int) -> bool:
+        return self._formatters[0].is_numeric(col)
+
+    def is_nan(self, row: int, col: int) -> bool:
+        formatter, offset = self._locate(row)
+        return formatter.is_nan(offset, col)
+
+    def text(self, row: int, col: int) -> str:
+        formatter, offset = self._locate(row)
+        return formatter.text(offset, col)
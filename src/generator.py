@@ -28,5 +28,6 @@ def gen_int(filename: str, rows: int, cols: int) -> None:
             f.write("\n")
 
 
-#gen_int("dane.csv", 100000, 10)
-gen_int("small_data.csv", 5000, 10)
+if __name__ == '__main__':
+    #gen_int("dane.csv", 100000, 10)
+    gen_int("small_data.csv", 5000, 10)
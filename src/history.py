@@ -0,0 +1,69 @@
+MB = 1024 * 1024
+
+
+def state_size(state) -> int:
+    """ bytes held by state: arrays (e.g. row masks) in it, other objects are not counted """
+    if isinstance(state, (tuple, list)):
+        return sum(state_size(item) for item in state)
+    return int(getattr(state, 'nbytes', 0))
+
+
+class History:
+    """ undo / redo stacks of states of current data - (label, state), state holds references to
+        immutable row masks, the data frame is never copied, so undo and redo only swap references;
+        oldest states are dropped when states take more than max_bytes """
+
+    def __init__(self, max_bytes=64 * MB):
+        self.max_bytes = max_bytes
+        self._undo = []
+        self._redo = []
+
+    def push(self, label: str, state) -> None:
+        """ state before operation (label), redo stack is cleared """
+        self._undo.append((label, state))
+        self._redo.clear()
+        self.evict()
+
+    def undo(self, current):
+        """ (label, state) of the last operation, current state can be redone; None - nothing to undo """
+        if not self._undo:
+            return None
+        label, state = self._undo.pop()
+        self._redo.append((label, current))
+        self.evict()
+        return label, state
+
+    def redo(self, current):
+        """ (label, state) after undone operation, current state can be undone again; None - nothing to redo """
+        if not self._redo:
+            return None
+        label, state = self._redo.pop()
+        self._undo.append((label, current))
+        self.evict()
+        return label, state
+
+    def can_undo(self) -> bool:
+        return len(self._undo) > 0
+
+    def can_redo(self) -> bool:
+        return len(self._redo) > 0
+
+    def undo_label(self):
+        return self._undo[-1][0] if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1][0] if self._redo else None
+
+    def size(self) -> int:
+        return sum(state_size(state) for _, state in self._undo + self._redo)
+
+    def evict(self) -> None:
+        """ drop the oldest undo states (then the farthest redo states) above max_bytes """
+        total = self.size()
+        for stack in (self._undo, self._redo):
+            while stack and total > self.max_bytes:
+                total -= state_size(stack.pop(0)[1])
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+
+# folder of API links database (apilinks.sqlite), cache of API downloads is stored next to it
+CONFIG_FOLDER = os.path.join(os.path.expanduser("~"), '.config', 'CSV_Viewer')
+HTTP_CACHE_FOLDER = os.path.join(CONFIG_FOLDER, 'http_cache')
+MB = 1024 * 1024
+
+
+class HttpCache:
+    """ responses of API downloads stored on disk with ETag / Last-Modified, used without request for ttl
+        seconds, later revalidated with conditional GET; least recently used responses are removed
+        above max_size (bytes); one cache can be shared by threads (e.g. fetch_many) """
+
+    def __init__(self, folder=HTTP_CACHE_FOLDER, ttl=3600, max_size=100 * MB):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_size = max_size
+        # eviction by one thread at a time
+        self._lock = threading.Lock()
+
+    def key(self, url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def path(self, url: str, ext='.body') -> str:
+        return os.path.join(self.folder, self.key(url) + ext)
+
+    def lookup(self, url: str):
+        """ metadata of cached response (url, etag, last_modified, stored, size) or None """
+        try:
+            with open(self.path(url, '.json'), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url or not os.path.isfile(self.path(url)):
+            return None
+        return entry
+
+    def fresh(self, entry: dict) -> bool:
+        """ response is younger than ttl, can be used without asking server """
+        return time.time() - entry['stored'] < self.ttl
+
+    def validators(self, entry: dict) -> dict:
+        """ headers of conditional request """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, url: str, f) -> int:
+        """ copy cached body to file object, returns number of bytes """
+        path = self.path(url)
+        with open(path, 'rb') as body:
+            shutil.copyfileobj(body, f)
+        # mtime of body - time of last use
+        os.utime(path)
+        return os.path.getsize(path)
+
+    def open(self, url: str):
+        """ cached body as binary file object for reading (e.g. parsed while read) """
+        path = self.path(url)
+        f = open(path, 'rb')
+        # mtime of body - time of last use
+        os.utime(path)
+        return f
+
+    def _write_entry(self, url: str, entry: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.path(url, '.json'))
+
+    def store(self, url: str, f, headers) -> None:
+        """ store body (read from file object from the beginning) and validators of response """
+        if not headers.get('ETag') and not headers.get('Last-Modified') and self.ttl <= 0:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        f.seek(0)
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as body:
+            shutil.copyfileobj(f, body)
+            size = body.tell()
+        os.replace(tmp_path, self.path(url))
+        self._write_entry(url, {'url': url, 'etag': headers.get('ETag'), 'last_modified': headers.get('Last-Modified'),
+                                'stored': time.time(), 'size': size})
+        self.evict()
+
+    def refresh(self, url: str, entry: dict, headers) -> None:
+        """ server confirmed cached response (304 Not Modified) """
+        entry = dict(entry, stored=time.time())
+        entry['etag'] = headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+        self._write_entry(url, entry)
+
+    def files(self) -> list:
+        """ cached bodies as (last use, size, path), oldest first """
+        result = []
+        if os.path.isdir(self.folder):
+            for entry in os.scandir(self.folder):
+                if entry.is_file() and entry.name.endswith('.body'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # removed by other process meanwhile
+                        continue
+                    result.append((stat.st_mtime, stat.st_size, entry.path))
+        return sorted(result)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.files())
+
+    def _remove(self, path: str) -> None:
+        for name in (path, path[:-len('.body')] + '.json'):
+            try:
+                os.remove(name)
+            except FileNotFoundError:
+                pass
+
+    def evict(self) -> None:
+        with self._lock:
+            files = self.files()
+            total = sum(size for _, size, _ in files)
+            for _, size, path in files:
+                if total <= self.max_size:
+                    break
+                self._remove(path)
+                total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self.files():
+                self._remove(path)
@@ -1,17 +1,129 @@
+import numpy as np
+import pandas as pd
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QVBoxLayout, QTableView
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QVBoxLayout, QTableView, QLabel
+
+
+def _update_unique(sketch, df) -> None:
+    """ add values of columns to distinct count sketch (one group per column), numeric columns
+        are hashed together as one array """
+    numeric = [col for col, dtype in enumerate(df.dtypes)
+               if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+    if numeric:
+        values = df.iloc[:, numeric].to_numpy(dtype='float64', na_value=np.nan).ravel(order='F')
+        group = np.repeat(np.array(numeric), df.shape[0])
+        present = ~np.isnan(values)
+        sketch.update(values[present], group[present])
+    for col in set(range(df.shape[1])) - set(numeric):
+        values = df.iloc[:, col].dropna().to_numpy()
+        sketch.update(values, np.full(len(values), col))
+
+
+def _min_max(df):
+    """ min and max of numeric columns (NaN for other columns and columns without values), vectorized """
+    numeric = df.select_dtypes(include='number')
+    result = []
+    for values in (numeric.min().reindex(df.columns), numeric.max().reindex(df.columns)):
+        values = values.to_numpy(dtype=object)
+        # pd.NA of nullable columns (e.g. Int8 in compact mode) would propagate through fmin / fmax
+        values[pd.isna(values)] = np.nan
+        result.append(values)
+    return tuple(result)
+
+
+def column_info(df, progress=None, cancelled=None) -> list:
+    """ name, type, non-null count, unique count estimate, min, max and memory usage (bytes, deep)
+        of every column, computed over chunks of rows (temporary arrays stay small) """
+    from loader import frame_chunks
+
+    c_tab = column_info_chunks(frame_chunks(df), total=df.shape[0], progress=progress, cancelled=cancelled)
+    # memory of the whole frame (categories of compact columns are counted once)
+    for row, size in zip(c_tab, df.memory_usage(deep=True, index=False).to_numpy()):
+        row[6] = int(size)
+    return c_tab
+
+
+def column_info_chunks(chunks, total=None, progress=None, cancelled=None, memory=False) -> list:
+    """ column_info computed in one pass over chunks of data, memory usage only when
+        memory is True (chunks in memory) """
+    from loader import CancelledError
+    from stats import HyperLogLog
+
+    c_tab = None
+    sketch = None
+    rows = 0
+    for chunk in chunks:
+        if cancelled is not None and cancelled():
+            raise CancelledError()
+        counts = chunk.notna().sum().to_numpy()
+        minimum, maximum = _min_max(chunk)
+        dtypes = list(chunk.dtypes)
+        if c_tab is None:
+            c_tab = [[chunk.columns[col], dtypes[col], 0, 0, np.nan, np.nan, 0 if memory else None]
+                     for col in range(chunk.shape[1])]
+            sketch = HyperLogLog(groups=chunk.shape[1])
+        if memory:
+            for row, size in zip(c_tab, chunk.memory_usage(deep=True, index=False).to_numpy()):
+                row[6] += int(size)
+        _update_unique(sketch, chunk)
+        for col, row in enumerate(c_tab):
+            dtype = dtypes[col]
+            if row[1] != dtype:
+                try:
+                    row[1] = np.result_type(row[1], dtype)
+                except TypeError:
+                    row[1] = np.dtype(object)
+            row[2] += int(counts[col])
+            row[4] = np.fmin(row[4], minimum[col])
+            row[5] = np.fmax(row[5], maximum[col])
+        rows += chunk.shape[0]
+        if progress is not None and total:
+            progress(min(100, int(100 * rows / total)))
+    if c_tab is not None:
+        for row, unique in zip(c_tab, sketch.counts()):
+            row[3] = int(unique)
+    return c_tab or []
+
+
+def memory_info(df, column_memory=None) -> str:
+    """ memory usage of data frame, with memory saved by compact loading mode,
+        column_memory - memory of columns computed before (bytes) """
+    MB = 1024 * 1024
+    if column_memory is None:
+        memory = df.memory_usage(deep=True).sum()
+    else:
+        memory = column_memory + df.index.memory_usage(deep=True)
+    text = f"Memory usage: {memory / MB:.1f} MB"
+    uncompacted = df.attrs.get('memory_uncompacted')
+    if uncompacted:
+        text += f" (compact mode, saved {(uncompacted - memory) / MB:.1f} MB of {uncompacted / MB:.1f} MB)"
+    return text
+
+
+def table_info(data, total=None, progress=None, cancelled=None) -> tuple:
+    """ (column info, memory text) of data frame or chunks of data (memory text None) """
+    if hasattr(data, 'memory_usage'):
+        c_tab = column_info(data, progress=progress, cancelled=cancelled)
+        return c_tab, memory_info(data, sum(row[6] for row in c_tab))
+    return column_info_chunks(data, total, progress=progress, cancelled=cancelled), None
 
 
 class InfoModel(QtCore.QAbstractTableModel):
     def __init__(self, data):
         super(InfoModel, self).__init__()
         self._data = data
-        self.columns = [' Column name ', ' Column type ', ' Non-null count ']
+        self.columns = [' Column name ', ' Column type ', ' Non-null count ', ' Unique (≈) ', ' Min ', ' Max ',
+                        ' Memory (KB) ']
 
     def data(self, index, role):
         if role == Qt.DisplayRole:
             value = self._data[index.row()][index.column()]
+            # None, NaN, pd.NA (nullable columns), NaT
+            if pd.isna(value):
+                return ""
+            if index.column() == 6:
+                return f"{value / 1024:.1f}"
             if isinstance(value, str):
                 return value
             else:
@@ -19,7 +131,7 @@ class InfoModel(QtCore.QAbstractTableModel):
 
         if role == Qt.TextAlignmentRole:
             value = index.column()
-            if value == 2:
+            if value >= 2:
                 return Qt.AlignVCenter + Qt.AlignRight
             else:
                 return Qt.AlignVCenter + Qt.AlignLeft
@@ -28,7 +140,7 @@ class InfoModel(QtCore.QAbstractTableModel):
         return len(self._data)
 
     def columnCount(self, index):
-        return len(self._data[0])
+        return len(self.columns)
 
     def headerData(self, section, orientation, role):
         if role == Qt.DisplayRole:
@@ -40,7 +152,7 @@ class InfoModel(QtCore.QAbstractTableModel):
 
 
 class InfoDialog(QDialog):
-    def __init__(self, df):
+    def __init__(self, c_tab, memory=None):
         super().__init__()
         self.setMinimumSize(600, 350)
         QBtn = QDialogButtonBox.Ok
@@ -48,17 +160,13 @@ class InfoDialog(QDialog):
         self.buttonBox.accepted.connect(self.accept)
         self.layout = QVBoxLayout()
 
-        # info about columns
-        c_names = df.columns.values.tolist()
-        c_tab = []
-        for item in c_names:
-            c_tab.append([item, df.dtypes[item], df[item].notnull().sum()])
-
         self.table = QTableView()
         self.model = InfoModel(c_tab)
         self.table.setModel(self.model)
         self.table.resizeColumnsToContents()
 
         self.layout.addWidget(self.table)
+        if memory is not None:
+            self.layout.addWidget(QLabel(memory))
         self.layout.addWidget(self.buttonBox)
         self.setLayout(self.layout)
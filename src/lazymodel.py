@@ -0,0 +1,153 @@
+import io
+import os
+from collections import OrderedDict
+import pandas as pd
+from PyQt5 import QtCore, QtGui
+from PyQt5.QtCore import Qt
+from formatter import ColumnFormatter
+from loader import read_options
+import rowindex
+
+
+class CsvSource:
+    """ csv file read from disk in row windows, through index of row offsets """
+
+    def __init__(self, file_name: str, sep=',', decimal='.', header=True, index=True, progress=None, cancelled=None):
+        self.file_name = file_name
+        self.options = read_options(sep, decimal, header, index)
+        self.header = header
+        self.index = index
+
+        # memory mapped offsets of rows (header row is skipped), persisted between sessions
+        self.offsets = rowindex.load_row_offsets(file_name, progress=progress, cancelled=cancelled)
+        self.first = 1 if header else 0
+        self.end = os.path.getsize(file_name)
+
+        # column names and name of row labels column
+        if header:
+            head = pd.read_csv(file_name, nrows=0, **self.options)
+            self.columns = head.columns
+            self.index_name = head.index.name
+        else:
+            sample = self.read_rows(0, 1)
+            self.columns = sample.columns
+            self.index_name = None
+
+    @property
+    def row_count(self) -> int:
+        return max(0, len(self.offsets) - self.first)
+
+    def offset(self, row: int) -> int:
+        """ position of data row in file, row_count - end of file """
+        if row + self.first < len(self.offsets):
+            return int(self.offsets[row + self.first])
+        return self.end
+
+    @property
+    def shape(self) -> tuple:
+        return self.row_count, len(self.columns)
+
+    def read_rows(self, start: int, stop: int):
+        """ parse rows [start, stop) of the file into DataFrame """
+        stop = min(stop, self.row_count)
+        with open(self.file_name, 'rb') as f:
+            f.seek(self.offset(start))
+            raw = f.read(self.offset(stop) - self.offset(start))
+
+        options = dict(self.options)
+        options['header'] = None
+        if self.header:
+            names = list(self.columns)
+            if self.index:
+                names.insert(0, self.index_name)
+            options['names'] = names
+        data = pd.read_csv(io.BytesIO(raw), **options)
+        if not self.index:
+            data.index = pd.RangeIndex(start, start + data.shape[0])
+        return data
+
+    def iter_chunks(self, chunksize=100000):
+        """ chunked pass over the whole file """
+        with pd.read_csv(self.file_name, chunksize=chunksize, **self.options) as reader:
+            for chunk in reader:
+                yield chunk
+
+
+class LazyTableModel(QtCore.QAbstractTableModel):
+    """ table model for CsvSource, rows are parsed only for windows requested by view """
+
+    def __init__(self, source: CsvSource, round_num: int, page_size=1000, max_pages=64, fetch_size=10000):
+        super().__init__()
+        self.source = source
+        self.round_num = round_num
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.fetch_size = fetch_size
+        self._pages = OrderedDict()
+        self._rows = min(fetch_size, source.row_count)
+
+    def _page(self, row: int):
+        """ return (page frame, formatter, offset of row in page), pages kept in LRU cache """
+        page_no, offset = divmod(row, self.page_size)
+        page = self._pages.get(page_no)
+        if page is None:
+            start = page_no * self.page_size
+            data = self.source.read_rows(start, start + self.page_size)
+            page = (data, ColumnFormatter(data, self.round_num))
+            self._pages[page_no] = page
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        return page[0], page[1], offset
+
+    def data(self, index, role):
+        if role == Qt.DisplayRole or role == Qt.ForegroundRole:
+            data, formatter, offset = self._page(index.row())
+            if offset >= data.shape[0] or index.column() >= data.shape[1]:
+                return None
+            if role == Qt.DisplayRole:
+                return formatter.text(offset, index.column())
+            if formatter.is_nan(offset, index.column()):
+                return QtGui.QColor("red")
+
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignVCenter + Qt.AlignRight
+
+    def rowCount(self, index) -> int:
+        # rows fetched so far
+        return self._rows
+
+    def columnCount(self, index) -> int:
+        return len(self.source.columns)
+
+    def canFetchMore(self, index) -> bool:
+        return self._rows < self.source.row_count
+
+    def fetchMore(self, index) -> None:
+        count = min(self.fetch_size, self.source.row_count - self._rows)
+        self.beginInsertRows(QtCore.QModelIndex(), self._rows, self._rows + count - 1)
+        self._rows += count
+        self.endInsertRows()
+
+    def setRoundNum(self, round_num: int) -> None:
+        """ change number of decimal places, formatted pages are invalidated """
+        self.round_num = round_num
+        for data, formatter in self._pages.values():
+            formatter.clear(round_num)
+        self.dataChanged.emit(self.index(0, 0), self.index(self._rows - 1, self.columnCount(None) - 1))
+
+    def headerData(self, section: int, orientation, role: int) -> str:
+        if role == Qt.DisplayRole:
+            if orientation == Qt.Horizontal:
+                return str(self.source.columns[section])
+
+            if orientation == Qt.Vertical:
+                data, formatter, offset = self._page(section)
+                if offset >= data.shape[0]:
+                    return None
+                label = data.index[offset]
+                if isinstance(label, str):
+                    return label
+                else:
+                    return str(label + 1)
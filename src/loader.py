@@ -0,0 +1,202 @@
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+
+
+class CancelledError(Exception):
+    """ long running operation cancelled by user """
+
+
+def read_options(sep=',', decimal='.', header=True, index=True) -> dict:
+    """ pandas read_csv arguments for options from open dialog """
+    if header:
+        my_header = 'infer'
+    else:
+        my_header = None
+
+    if index:
+        my_index = 0
+    else:
+        my_index = False
+
+    return {'sep': sep, 'decimal': decimal, 'header': my_header, 'index_col': my_index}
+
+
+def category_columns(file_name: str, sep=',', decimal='.', header=True, index=True, sample_rows=10000,
+                     max_ratio=0.5) -> dict:
+    """ text columns with low cardinality in sample of the file, candidates for category dtype,
+        returns column name: dtype of the column in default reading mode """
+    sample = pd.read_csv(file_name, nrows=sample_rows, **read_options(sep, decimal, header, index))
+    result = {}
+    for name in sample.columns:
+        column = sample[name]
+        if pd.api.types.is_object_dtype(column.dtype) or pd.api.types.is_string_dtype(column.dtype):
+            if column.nunique() <= max(1, int(max_ratio * column.count())):
+                result[name] = column.dtype
+    return result
+
+
+def compact_frame(df):
+    """ numeric columns downcast to the narrowest type: integer values to nullable Int8/16/32/64,
+        other floats to float32 """
+    df = df.copy(deep=False)
+    for col in range(df.shape[1]):
+        column = df.iloc[:, col]
+        dtype = column.dtype
+        if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+            continue
+        values = column.dropna()
+        if pd.api.types.is_float_dtype(dtype) and not (values % 1 == 0).all():
+            if values.abs().max() < np.finfo(np.float32).max:
+                df.isetitem(col, column.astype('float32'))
+            continue
+        low, high = (values.min(), values.max()) if len(values) > 0 else (0, 0)
+        for target in ('Int8', 'Int16', 'Int32', 'Int64'):
+            info = np.iinfo(target.lower())
+            if info.min <= low and high <= info.max:
+                df.isetitem(col, column.astype(target))
+                break
+    return df
+
+
+def read_csv_chunked(file_name: str, sep=',', decimal='.', header=True, index=True, chunksize=100000,
+                     compact=False, progress=None, cancelled=None):
+    """ read csv file in chunks, report progress (0-100) based on bytes read,
+        cancelled - function returning True when reading should stop,
+        compact - narrow numeric types and low cardinality text columns as category (memory saved
+        is stored in df.attrs['memory_uncompacted']) """
+    size = os.path.getsize(file_name)
+    options = read_options(sep, decimal, header, index)
+    categories = {}
+    if compact:
+        categories = category_columns(file_name, sep, decimal, header, index)
+        options['dtype'] = {name: 'category' for name in categories}
+
+    chunks = []
+    memory_uncompacted = 0
+    with open(file_name, 'rb') as f:
+        reader = pd.read_csv(f, chunksize=chunksize, **options)
+        with reader:
+            for chunk in reader:
+                if cancelled is not None and cancelled():
+                    raise CancelledError()
+                if compact:
+                    memory_uncompacted += chunk.memory_usage(deep=True).sum()
+                    for name, dtype in categories.items():
+                        # size of column read as text
+                        memory_uncompacted += chunk[name].astype(dtype).memory_usage(deep=True, index=False) \
+                            - chunk[name].memory_usage(deep=True, index=False)
+                    chunk = compact_frame(chunk)
+                chunks.append(chunk)
+                if progress is not None and size > 0:
+                    progress(min(100, int(100 * f.tell() / size)))
+
+    if compact and len(chunks) > 1:
+        # the same categories in all chunks, so concat keeps category dtype
+        for name in categories:
+            union = pd.api.types.union_categoricals([chunk[name] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[name] = chunk[name].cat.set_categories(union)
+
+    if len(chunks) == 1:
+        df = chunks[0]
+    else:
+        df = pd.concat(chunks)
+    if compact:
+        df.attrs['memory_uncompacted'] = int(memory_uncompacted)
+    return df
+
+
+def iter_csv_chunks(file_name: str, sep=',', decimal='.', header=True, index=True, chunksize=100000):
+    """ chunks of csv file read one by one (memory bounded by chunk size) """
+    with pd.read_csv(file_name, chunksize=chunksize, **read_options(sep, decimal, header, index)) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def frame_chunks(df, chunksize=100000):
+    """ data frame as chunks of rows (at least one, possibly empty chunk) """
+    yield df.iloc[:chunksize]
+    for start in range(chunksize, df.shape[0], chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def compact_loaded(df, max_ratio=0.5):
+    """ compact data frame loaded without chunks: low cardinality text columns as category,
+        numeric columns downcast """
+    memory_uncompacted = df.memory_usage(deep=True).sum()
+    df = compact_frame(df)
+    for col in range(df.shape[1]):
+        column = df.iloc[:, col]
+        if pd.api.types.is_object_dtype(column.dtype) or pd.api.types.is_string_dtype(column.dtype):
+            if column.nunique() <= max(1, int(max_ratio * column.count())):
+                df.isetitem(col, column.astype('category'))
+    df.attrs['memory_uncompacted'] = int(memory_uncompacted)
+    return df
+
+
+def read_csv_pyarrow(file_name: str, sep=',', decimal='.', header=True, index=True, progress=None, cancelled=None):
+    """ read csv file with multithreaded pyarrow parser (no chunks, progress only at the end) """
+    options = read_options(sep, decimal, header, index)
+    if options['index_col'] is False:
+        options['index_col'] = None
+    df = pd.read_csv(file_name, engine='pyarrow', **options)
+    if cancelled is not None and cancelled():
+        raise CancelledError()
+    if progress is not None:
+        progress(100)
+    return df
+
+
+# parser engines (name: description shown in open dialog)
+ENGINES = {
+    'c': "C (pandas, chunked)",
+    'pyarrow': "PyArrow (multithreaded)",
+    'parallel': "Parallel (multiprocess)",
+}
+
+
+def read_csv(file_name: str, sep=',', decimal='.', header=True, index=True, engine='c', compact=False,
+             progress=None, cancelled=None):
+    """ read csv file with selected engine: c (chunked pandas parser), pyarrow (multithreaded arrow parser)
+        or parallel (rows split between processes); when engine cannot be used (not installed or options
+        not supported) file is read with c engine; engine used is stored in df.attrs['engine'] """
+    df = None
+    if engine == 'pyarrow' and pyarrow_available():
+        try:
+            df = read_csv_pyarrow(file_name, sep, decimal, header, index, progress=progress, cancelled=cancelled)
+        except (ValueError, TypeError, AttributeError):
+            df = None
+    elif engine == 'parallel':
+        import parallel
+        try:
+            df = parallel.read_csv_parallel(file_name, sep, decimal, header, index,
+                                            progress=progress, cancelled=cancelled)
+        except (ValueError, TypeError, OSError):
+            df = None
+
+    if df is None:
+        engine = 'c'
+        df = read_csv_chunked(file_name, sep, decimal, header, index, compact=compact,
+                              progress=progress, cancelled=cancelled)
+    elif compact:
+        df = compact_loaded(df)
+    df.attrs['engine'] = engine
+    return df
+
+
+def load_csv(file_name: str, sep=',', decimal='.', header=True, index=True, engine='c', compact=False, cache=None,
+             progress=None, cancelled=None):
+    """ read csv file from parse cache (if given and file was parsed before) or with selected engine """
+    if cache is not None:
+        df = cache.get(file_name, sep=sep, decimal=decimal, header=header, index=index, compact=compact)
+        if df is not None:
+            df.attrs['engine'] = 'cache'
+            return df
+    return read_csv(file_name, sep, decimal, header, index, engine=engine, compact=compact,
+                    progress=progress, cancelled=cancelled)
@@ -1,104 +1,159 @@
 import io
-import numpy as np
-import pandas as pd
-from sqlalchemy import create_engine
+import os
+import threading
+import importlib
 from PyQt5 import QtCore, QtWidgets, QtGui
 from PyQt5.QtWidgets import QToolBar, QAction, QStatusBar, QStyle, QMessageBox, QLabel, QFileDialog, QInputDialog,\
-    QProgressBar
-from PyQt5.QtCore import Qt, QSize, QSettings, QFileInfo, QRunnable, QThreadPool, pyqtSlot, QObject, pyqtSignal
-from summary import SummaryDialog
-from fileparam import ParameterDialog
-from apiparam import ApiDialog
-from about import AboutDialog
-from info import InfoDialog
-import dataload
-import time
+    QProgressBar, QComboBox, QLineEdit
+from PyQt5.QtCore import Qt, QSize, QSettings, QFileInfo, QThreadPool
+from workers import Worker, CsvLoadWorker, CsvIndexWorker, ExportWorker, StatsWorker, DownloadWorker, \
+    ApiStreamWorker
+from cache import ParseCache, cache_available, MB
+from history import History
 import sys
 
+# model role: cell contains text searched with Find
+SearchHitRole = Qt.UserRole + 1
 
+# modules needed for data (pandas, numpy...) are imported in background thread after the main window
+# is shown, modules of other features (dialogs, requests, QtSql, xlsxwriter) when the feature is used
+PRELOAD_MODULES = ['numpy', 'pandas', 'loader', 'formatter', 'lazymodel', 'export', 'stats', 'fileparam']
 
-if "pytest" in sys.modules:
-    app_test = True
-else:
-    app_test = False
 
+def preload_modules() -> None:
+    """ import PRELOAD_MODULES (run in background thread) """
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
 
-class WorkerSignals(QObject):
-    progress = pyqtSignal(int)
-    status = pyqtSignal(bool)
 
 
-class MarkdownWorker(QRunnable):
-    """ export worker (thread) """
-
-    def __init__(self, *args, **kwargs):
-        super().__init__()
-        self.args = args
-        self.kwargs = kwargs
-        self.signals = WorkerSignals()
-
-    @pyqtSlot()
-    def run(self):
-        """ run thread worker """
-        file_name = self.args[0]
-        df = self.args[1]
-        self.signals.status.emit(True)
-        with open(file_name, 'w') as f:
-            size = df.shape[0]
-            counter = 0
-
-            # title
-            f.write("***Table***\n\n")
-
-            # header line
-            headers = list(df.columns.values)
-            line = " | "
-            line2 = "|"
-            for item in headers:
-                line += str(item) + " | "
-                line2 += "---:|"
-            f.write(line + '\n')
-            f.write(line2 + '\n')
-
-            # data
-            for row in df.itertuples():
-                counter += 1
-                line = " | "
-                for item in row:
-                    line += str(item) + " | "
-                f.write(line + '\n')
-                export_progress = int(100 * (counter/size))
-                self.signals.progress.emit(export_progress)
-                time.sleep(0.001)
-
-        self.signals.status.emit(False)
+if "pytest" in sys.modules:
+    app_test = True
+else:
+    app_test = False
 
 
 class TableModel(QtCore.QAbstractTableModel):
     def __init__(self, data, round_num):
         super().__init__()
         self._data = data
+        self._rows = None
+        self._hits = None
         self.round_num = round_num
+        from formatter import ColumnFormatter
+
+        self._formatter = ColumnFormatter(data, round_num)
 
     def data(self, index, role):
         if role == Qt.DisplayRole:
-            value = self._data.iloc[index.row(), index.column()]
-
-            if np.isreal(value) and not isinstance(value, bool):
-                return f"{value:.{self.round_num}f}"  # temporary all numbers as float
-            else:
-                return str(value)
+            return self._formatter.text(index.row(), index.column())
 
         if role == Qt.TextAlignmentRole:
             return Qt.AlignVCenter + Qt.AlignRight
 
         if role == Qt.ForegroundRole:
-            if pd.isna(self._data.iloc[index.row(), index.column()]):
+            if self._formatter.is_nan(index.row(), index.column()):
                 return QtGui.QColor("red")
 
+        if role == SearchHitRole:
+            return self.isSearchHit(index.row(), index.column())
+
+        if role == Qt.BackgroundRole:
+            if self.isSearchHit(index.row(), index.column()):
+                return QtGui.QColor("yellow")
+
+    def isSearchHit(self, row: int, col: int) -> bool:
+        return self._hits is not None and bool(self._hits[self._formatter.data_row(row), col])
+
+    def setSearchHits(self, hits) -> None:
+        """ cells highlighted as search hits - boolean array (data rows x columns), None - no hits """
+        self._hits = hits
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount(None) - 1, self.columnCount(None) - 1))
+
+    def setRoundNum(self, round_num: int) -> None:
+        """ change number of decimal places, formatted blocks are invalidated """
+        self.round_num = round_num
+        self._formatter.clear(round_num)
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount(None) - 1, self.columnCount(None) - 1))
+
+    def nanMask(self):
+        """ missing values of data (data rows x columns), computed once by formatter """
+        return self._formatter.nan_mask()
+
+    def appendChunk(self, chunk) -> None:
+        """ rows parsed while streaming appended at the end, only new rows are formatted,
+            data frame is not concatenated """
+        from formatter import ChunkedFormatter
+
+        if not isinstance(self._formatter, ChunkedFormatter):
+            self._formatter = ChunkedFormatter([self._data], self.round_num)
+        first = self._formatter.row_count()
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + chunk.shape[0] - 1)
+        self._formatter.append(chunk)
+        self.endInsertRows()
+
+    def streamedFrame(self):
+        """ rows appended by appendChunk as one data frame """
+        from formatter import ChunkedFormatter
+
+        if isinstance(self._formatter, ChunkedFormatter):
+            return self._formatter.frame()
+        return self._data
+
+    def appendRows(self, data) -> None:
+        """ data frame grew (rows appended at the end, e.g. rows streamed from API as one frame) """
+        from formatter import ColumnFormatter
+
+        first, last = self._formatter.row_count(), data.shape[0] - 1
+        if last >= first:
+            self.beginInsertRows(QtCore.QModelIndex(), first, last)
+        self._data = data
+        self._rows = None
+        self._hits = None
+        self._formatter = ColumnFormatter(data, self.round_num)
+        if last >= first:
+            self.endInsertRows()
+
+    def setRows(self, rows) -> None:
+        """ positions of data rows shown (e.g. sort permutation), None - all rows in data order,
+            data frame is not copied """
+        self.layoutAboutToBeChanged.emit()
+        self._rows = rows
+        self._formatter.set_rows(rows)
+        self.layoutChanged.emit()
+
+    def viewRows(self):
+        return self._rows
+
+    def hideRows(self, positions, max_runs=100) -> None:
+        """ remove rows of view (sorted positions) from view, data frame is not changed; runs of
+            adjacent rows are removed with beginRemoveRows, many runs with one layout change """
+        import numpy as np
+
+        rows = self._rows if self._rows is not None else np.arange(self._data.shape[0])
+        if len(positions) == 0:
+            return
+        breaks = np.flatnonzero(np.diff(positions) != 1)
+        firsts = positions[np.concatenate([[0], breaks + 1])]
+        lasts = positions[np.concatenate([breaks, [len(positions) - 1]])]
+        if len(firsts) > max_runs:
+            keep = np.ones(len(rows), dtype=bool)
+            keep[positions] = False
+            self.setRows(rows[keep])
+            return
+        # from the last run, so positions of earlier runs stay valid
+        for first, last in zip(firsts[::-1], lasts[::-1]):
+            self.beginRemoveRows(QtCore.QModelIndex(), int(first), int(last))
+            rows = np.delete(rows, np.s_[first:last + 1])
+            self._rows = rows
+            self._formatter.set_rows(rows)
+            self.endRemoveRows()
+
     def rowCount(self, index) -> int:
         # the length of csv file (rows)
-        return self._data.shape[0]
+        if self._rows is not None:
+            return len(self._rows)
+        return self._formatter.row_count()
 
     def columnCount(self, index) -> int:
         # length of csv file (columns)
@@ -111,10 +166,11 @@ class TableModel(QtCore.QAbstractTableModel):
                 return str(self._data.columns[section])
 
             if orientation == Qt.Vertical:
-                if isinstance(self._data.index[section], str):
-                    return self._data.index[section]
+                label = self._formatter.label(section)
+                if isinstance(label, str):
+                    return label
                 else:
-                    return str(self._data.index[section] + 1)
+                    return str(label + 1)
 
 
 class MainWindow(QtWidgets.QMainWindow):
@@ -127,12 +183,38 @@ class MainWindow(QtWidgets.QMainWindow):
         self.app_title = app_title
         self.setMinimumSize(600, 300)
         self.df = None
+        self.source = None
+        self.model = None
         self.round_num = 2
         self.recentFileActs = []
+        self.jobs = []
+        self.job_progress = {}
+        self.load_worker = None
+        # load worker whose rows are already shown (API streaming)
+        self.stream_worker = None
 
         # settings
         self.settings = QtCore.QSettings('CSV_Viewer', 'CSV_Viewer')
         self.round_num = self.settings.value('round_numbers', self.round_num, int)
+        self.cache = self.parse_cache()
+        # undo / redo of operations on rows (Remove NaN), memory limit from settings
+        self.history = History(self.settings.value('history_size_mb', 64, int) * MB)
+        self.stats_cache = None
+        self.info_data = None
+        # sort keys (column position, ascending) and cached permutations of rows
+        self.sort_keys = []
+        self.sort_orders = None
+        # filter expression (requested), mask of rows of applied filter
+        self.filter_expression = ''
+        self.filter_mask = None
+        self.mask_cache = None
+        # rows of data frame not removed (Remove NaN), None - all rows
+        self.row_mask = None
+        # search index of current data, last query and its hits (data rows x columns)
+        self.search_index = None
+        self.search_query = None
+        self.search_hits = None
+        self.preload_thread = None
 
         # toolbar
         self.toolbar = QToolBar("MainToolbar")
@@ -226,6 +308,16 @@ class MainWindow(QtWidgets.QMainWindow):
         self.toolbar.addAction(self.button_api)
         self.button_api.setEnabled(True)
 
+        # cancel running task action
+        style_cancel = self.toolbar.style()
+        icon = style_cancel.standardIcon(QStyle.SP_BrowserStop)
+        self.button_cancel = QAction(icon, "Cancel", self)
+        self.button_cancel.setShortcut('Esc')
+        self.button_cancel.setStatusTip("Cancel running task (loading, export, download)")
+        self.button_cancel.triggered.connect(self.onCancel)
+        self.toolbar.addAction(self.button_cancel)
+        self.button_cancel.setEnabled(False)
+
         # close action
         style_close = self.toolbar.style()
         icon = style_close.standardIcon(QStyle.SP_DialogCloseButton)
@@ -253,6 +345,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self.button_nan.setStatusTip("Remove rows with missing values")
         self.button_nan.triggered.connect(self.onRemoveNaN)
 
+        # undo / redo actions
+        self.button_undo = QAction("Undo", self)
+        self.button_undo.setShortcut('Ctrl+Z')
+        self.button_undo.setStatusTip("Undo the last operation on rows")
+        self.button_undo.triggered.connect(self.onUndo)
+        self.button_redo = QAction("Redo", self)
+        self.button_redo.setShortcut('Ctrl+Y')
+        self.button_redo.setStatusTip("Redo the undone operation")
+        self.button_redo.triggered.connect(self.onRedo)
+
+        # restore rows removed by Remove NaN
+        self.button_restore = QAction("Restore removed rows", self)
+        self.button_restore.setStatusTip("Show again rows removed by Remove NaN")
+        self.button_restore.triggered.connect(self.onRestoreRows)
+
         # settings action
         style_settings = self.toolbar.style()
         icon = style_settings.standardIcon(QStyle.SP_ComputerIcon)
@@ -271,6 +378,54 @@ class MainWindow(QtWidgets.QMainWindow):
         self.toolbar.addAction(self.button_about)
         self.button_about.setEnabled(True)
 
+        # filter toolbar: query expression evaluated in background, recent filters in list
+        self.filter_bar = QToolBar("Filter")
+        self.addToolBarBreak()
+        self.addToolBar(self.filter_bar)
+        self.filter_bar.addWidget(QLabel("Filter: "))
+        self.filter_edit = QComboBox()
+        self.filter_edit.setEditable(True)
+        self.filter_edit.setInsertPolicy(QComboBox.NoInsert)
+        self.filter_edit.setMinimumWidth(400)
+        self.filter_edit.lineEdit().setPlaceholderText("e.g. col_3 > 50 and col_7.isna()")
+        self.filter_edit.lineEdit().returnPressed.connect(self.onFilter)
+        self.filter_edit.activated.connect(lambda index: self.onFilter())
+        self.filter_bar.addWidget(self.filter_edit)
+        self.button_filter = QAction("Apply", self)
+        self.button_filter.setStatusTip("Show only rows matching the filter expression")
+        self.button_filter.triggered.connect(self.onFilter)
+        self.filter_bar.addAction(self.button_filter)
+        self.button_filter_clear = QAction("Clear", self)
+        self.button_filter_clear.setStatusTip("Show all rows")
+        self.button_filter_clear.triggered.connect(self.onFilterClear)
+        self.filter_bar.addAction(self.button_filter_clear)
+
+        # find: text of cells is indexed in background on first search
+        self.filter_bar.addSeparator()
+        self.filter_bar.addWidget(QLabel(" Find: "))
+        self.find_edit = QLineEdit()
+        self.find_edit.setMinimumWidth(200)
+        self.find_edit.returnPressed.connect(lambda: self.onFind('next'))
+        self.filter_bar.addWidget(self.find_edit)
+        self.button_find = QAction("Find", self)
+        self.button_find.setShortcut('Ctrl+F')
+        self.button_find.setStatusTip("Find text in cells")
+        self.button_find.triggered.connect(self.onFindFocus)
+        self.button_find_next = QAction("Next", self)
+        self.button_find_next.setShortcut('F3')
+        self.button_find_next.setStatusTip("Go to the next cell with searched text")
+        self.button_find_next.triggered.connect(lambda: self.onFind('next'))
+        self.filter_bar.addAction(self.button_find_next)
+        self.button_find_previous = QAction("Previous", self)
+        self.button_find_previous.setShortcut('Shift+F3')
+        self.button_find_previous.setStatusTip("Go to the previous cell with searched text")
+        self.button_find_previous.triggered.connect(lambda: self.onFind('previous'))
+        self.filter_bar.addAction(self.button_find_previous)
+        self.button_find_all = QAction("All", self)
+        self.button_find_all.setStatusTip("Highlight all cells with searched text")
+        self.button_find_all.triggered.connect(lambda: self.onFind('all'))
+        self.filter_bar.addAction(self.button_find_all)
+
         self.setButtons(False)
 
         # recent menu action
@@ -284,8 +439,10 @@ class MainWindow(QtWidgets.QMainWindow):
         file_menu = menu.addMenu("&File")
         file_menu.addAction(self.button_open)
         file_menu.addAction(self.button_close)
+        file_menu.addAction(self.button_cancel)
         file_menu.addSeparator()
         file_menu.addAction(self.button_nan)
+        file_menu.addAction(self.button_restore)
         file_menu.addSeparator()
         file_menu.addAction(self.button_settings)
         self.separatorAct = file_menu.addSeparator()
@@ -296,12 +453,20 @@ class MainWindow(QtWidgets.QMainWindow):
 
         file_menu.addAction(self.button_quit)
 
+        edit_menu = menu.addMenu("&Edit")
+        edit_menu.addAction(self.button_undo)
+        edit_menu.addAction(self.button_redo)
+
         view_menu = menu.addMenu("Vie&w")
         view_menu.addAction(self.button_summary)
         view_menu.addAction(self.button_info)
         view_menu.addSeparator()
         view_menu.addAction(self.button_resize)
         view_menu.addSeparator()
+        view_menu.addAction(self.button_find)
+        view_menu.addAction(self.button_find_next)
+        view_menu.addAction(self.button_find_previous)
+        view_menu.addSeparator()
         view_menu.addAction(self.button_tool)
 
         export_menu = menu.addMenu("&Export")
@@ -331,16 +496,31 @@ class MainWindow(QtWidgets.QMainWindow):
         self.table = QtWidgets.QTableView()
         self.table.setSelectionBehavior(QtWidgets.QTableView.SelectRows)
         self.table.setSelectionMode(QtWidgets.QTableView.SingleSelection)
+        # click - sort by column, shift + click - add column to sort keys
+        self.table.horizontalHeader().sectionClicked.connect(self.onHeaderClicked)
 
         self.setCentralWidget(self.table)
         self.setWindowTitle(self.app_title)
         self.setMinimumSize(400, 250)
         self.setGeometry(200, 100, 1000, 600)
 
+        # import modules needed for data when event loop is running (main window shown)
+        QtCore.QTimer.singleShot(0, self.preloadModules)
+
+    def preloadModules(self) -> None:
+        """ Import modules needed for data in background thread """
+        if self.preload_thread is None:
+            self.preload_thread = threading.Thread(target=preload_modules, daemon=True)
+            self.preload_thread.start()
+
     def onToolbarOpenButtonClick(self) -> None:
         """ Show open dialog """
 
-        dlg = ParameterDialog()
+        from fileparam import ParameterDialog
+
+        dlg = ParameterDialog(lazy=self.settings.value('lazy_loading', False, bool),
+                              compact=self.settings.value('compact_memory', False, bool),
+                              engine=self.settings.value('engine', 'c'))
         dlg.setWindowTitle("Open")
         if dlg.exec_():
             file_name = dlg.filename.text()
@@ -348,17 +528,27 @@ class MainWindow(QtWidgets.QMainWindow):
             decimal = dlg.decimal
             header = dlg.header
             index = dlg.index
+            lazy = dlg.lazy
+            compact = dlg.compact
+            engine = dlg.engine
         else:
             file_name = None
 
         if file_name:
             self.saveRecent(file_name)
-            self.open_csv_file(file_name, separator, decimal, header, index)
+            self.settings.setValue('lazy_loading', lazy)
+            self.settings.setValue('compact_memory', compact)
+            self.settings.setValue('engine', engine)
+            self.open_csv_file(file_name, separator, decimal, header, index, lazy, compact, engine)
 
     def onOpenRecentFile(self, file_name: str, sep=',', decimal='.') -> None:
         """ Open file from recent list, show open dialog """
 
-        dlg = ParameterDialog(file_name, sep, decimal)
+        from fileparam import ParameterDialog
+
+        dlg = ParameterDialog(file_name, sep, decimal, lazy=self.settings.value('lazy_loading', False, bool),
+                              compact=self.settings.value('compact_memory', False, bool),
+                              engine=self.settings.value('engine', 'c'))
         dlg.setWindowTitle("Open")
         if dlg.exec_():
             file_name = dlg.filename.text()
@@ -366,39 +556,367 @@ class MainWindow(QtWidgets.QMainWindow):
             decimal = dlg.decimal
             header = dlg.header
             index = dlg.index
+            lazy = dlg.lazy
+            compact = dlg.compact
+            engine = dlg.engine
         else:
             file_name = None
 
         if file_name:
             self.saveRecent(file_name)
-            self.open_csv_file(file_name, separator, decimal, header, index)
-
-    def open_csv_file(self, file_name: str, sep=',', decimal=".", header=True, index=True) -> None:
-        """ Open csv file, load to tableview, set statusbar, enable close icon"""
-        try:
-            if header:
-                my_header = 'infer'
-            else:
-                my_header = None
-
-            if index:
-                my_index = 0
-            else:
-                my_index = False
+            self.settings.setValue('lazy_loading', lazy)
+            self.settings.setValue('compact_memory', compact)
+            self.settings.setValue('engine', engine)
+            self.open_csv_file(file_name, separator, decimal, header, index, lazy, compact, engine)
+
+    def open_csv_file(self, file_name: str, sep=',', decimal=".", header=True, index=True, lazy=False,
+                      compact=False, engine='c') -> None:
+        """ Open csv file in background thread, data is shown in tableview when loading is complete,
+            lazy - only index of rows is built, rows are read from disk when shown,
+            compact - narrow data types to save memory, engine - parser: c, pyarrow or parallel """
+        self.cancel_load()
+
+        if lazy:
+            worker = CsvIndexWorker(file_name, sep, decimal, header, index)
+        else:
+            worker = CsvLoadWorker(file_name, sep, decimal, header, index, engine=engine, compact=compact,
+                                   cache=self.cache)
+        options = {'sep': sep, 'decimal': decimal, 'header': header, 'index': index, 'compact': compact}
+        worker.signals.result.connect(lambda data: self.onCsvLoaded(worker, file_name, data, options))
+        worker.signals.error.connect(lambda text: self.onCsvLoadError(worker, file_name))
+        worker.signals.cancelled.connect(lambda: self.onCsvLoadCancelled(worker))
+        self.load_worker = worker
+        self.my_status.showMessage(f"Loading: {file_name}")
+        self.start_worker(worker)
+
+    def onCsvLoaded(self, worker, file_name: str, data, options: dict) -> None:
+        """ Loading finished - set tableview, statusbar, enable close icon, store parsed data in cache """
+        if worker is not self.load_worker:
+            return
+        self.load_worker = None
+        self.my_status.clearMessage()
+        self.show_data(data, file_name)
+        self.setButtons(True)
+        if self.df is not None and 'engine' in self.df.attrs:
+            self.my_status.showMessage(f"Parser: {self.df.attrs['engine']}", 5000)
+
+        if self.df is not None and self.cache is not None and os.path.isfile(file_name) \
+                and self.cache.wanted(file_name) and not self.cache.contains(file_name, **options):
+            worker = Worker(self.cache.put, file_name, self.df.copy(deep=False), **options)
+            worker.signals.error.connect(lambda text: self.my_status.showMessage(f"Cache write failed: {text}", 5000))
+            self.threadpool.start(worker)
 
-            print(my_header, my_index)
-            data = pd.read_csv(file_name, sep=sep, decimal=decimal, header=my_header, index_col=my_index)
+    def show_data(self, data, title: str) -> None:
+        """ Set data frame or lazy source as current data shown in tableview """
+        from lazymodel import CsvSource, LazyTableModel
+        from stats import StatsCache
+
+        self.stats_cache = StatsCache()
+        self.info_data = None
+        self.reset_view()
+        if isinstance(data, CsvSource):
+            self.df = None
+            self.source = data
+            self.model = LazyTableModel(self.source, self.round_num)
+        else:
             self.df = data
+            self.source = None
             self.model = TableModel(self.df, self.round_num)
-            self.labelStatus.setText(f"Rows: {self.df.shape[0]} Cols: {self.df.shape[1]}")
-            self.table.setModel(self.model)
-            if data.shape[0] > 0:
-                self.table.selectRow(0)
-
-            self.setButtons(True)
-            self.setWindowTitle(self.app_title + ": " + file_name)
-        except Exception as e:
-            QMessageBox.warning(self, 'Error', f"Error loading the file:\n {file_name}")
+        rows, cols = self.data_shape()
+        self.labelStatus.setText(f"Rows: {rows} Cols: {cols}")
+        self.table.setModel(self.model)
+        if rows > 0:
+            self.table.selectRow(0)
+        self.setWindowTitle(self.app_title + ": " + title)
+
+    def reset_view(self) -> None:
+        """ Data changed - forget removed rows, sort keys, filter and cached permutations and masks """
+        from filtering import MaskCache
+        from sorting import OrderCache
+
+        self.row_mask = None
+        self.history.clear()
+        self.sort_keys = []
+        self.sort_orders = OrderCache()
+        self.filter_expression = ''
+        self.filter_mask = None
+        self.mask_cache = MaskCache()
+        self.table.horizontalHeader().setSortIndicatorShown(False)
+        self.reset_search()
+
+    def reset_search(self) -> None:
+        """ Data or its text changed - search index is built again on next search """
+        self.search_index = None
+        self.search_query = None
+        self.search_hits = None
+        if self.model is not None and isinstance(self.model, TableModel):
+            self.model.setSearchHits(None)
+
+    def update_view(self) -> None:
+        """ Show rows matching filter in sort order (cached permutation), data frame is not copied """
+        from filtering import view_rows
+
+        order = self.sort_orders.get(tuple(self.sort_keys)) if self.sort_keys else None
+        if self.sort_keys and order is None:
+            # permutation was removed from cache, view is updated when it is sorted again
+            self.apply_sort(self.sort_keys)
+            return
+        mask = self.filter_mask
+        if self.row_mask is not None:
+            mask = self.row_mask if mask is None else mask & self.row_mask
+        self.model.setRows(view_rows(mask, order))
+        self.show_row_count()
+
+    def show_row_count(self) -> None:
+        """ Number of rows shown (of all rows of current data) in statusbar """
+        rows, cols = self.data_shape()
+        shown = self.model.rowCount(None)
+        if shown < rows:
+            self.labelStatus.setText(f"Rows: {shown} of {rows} Cols: {cols}")
+        else:
+            self.labelStatus.setText(f"Rows: {rows} Cols: {cols}")
+
+    def onFilter(self) -> None:
+        """ Apply filter expression, mask is computed in background thread (cached for recent filters) """
+        if self.df is None:
+            return
+        expression = self.filter_edit.currentText().strip()
+        if not expression:
+            self.onFilterClear()
+            return
+        if expression == self.filter_expression and self.filter_mask is not None:
+            return
+        self.filter_expression = expression
+        mask = self.mask_cache.get(expression)
+        if mask is not None:
+            self.onFiltered(self.df, expression, mask)
+            return
+        import filtering
+
+        df = self.df
+        worker = Worker(filtering.filter_mask, df.copy(deep=False), expression)
+        worker.signals.result.connect(lambda mask: self.onFiltered(df, expression, mask))
+        worker.signals.error.connect(lambda text: self.onFilterError(df, expression, text))
+        self.my_status.showMessage(f"Filtering: {expression}")
+        self.start_worker(worker)
+
+    def onFiltered(self, df, expression: str, mask) -> None:
+        if df is not self.df:
+            return
+        self.mask_cache.put(expression, mask)
+        if expression != self.filter_expression:
+            return
+        self.filter_mask = mask
+        self.update_view()
+        self.my_status.showMessage(f"Filter: {self.model.rowCount(None)} rows match", 5000)
+        # recent filters at the top of the list
+        index = self.filter_edit.findText(expression)
+        if index >= 0:
+            self.filter_edit.removeItem(index)
+        self.filter_edit.insertItem(0, expression)
+        self.filter_edit.setCurrentIndex(0)
+        while self.filter_edit.count() > 10:
+            self.filter_edit.removeItem(self.filter_edit.count() - 1)
+
+    def onFilterError(self, df, expression: str, text: str) -> None:
+        if df is not self.df or expression != self.filter_expression:
+            return
+        self.filter_expression = ''
+        self.my_status.clearMessage()
+        QMessageBox.warning(self, "Error", f"Wrong filter expression:\n {text}")
+
+    def onFindFocus(self) -> None:
+        self.find_edit.setFocus()
+        self.find_edit.selectAll()
+
+    def onFind(self, direction='next') -> None:
+        """ Find text in cells: go to next/previous hit or highlight all (direction 'all'),
+            search index is built in background thread on the first search """
+        if self.df is None or self.stream_worker is not None:
+            return
+        query = self.find_edit.text()
+        if not query:
+            self.search_query = None
+            self.search_hits = None
+            self.model.setSearchHits(None)
+            return
+        if self.search_index is None:
+            import search
+
+            df = self.df
+            worker = Worker(search.build_index, df.copy(deep=False), self.round_num)
+            worker.signals.result.connect(lambda index: self.onSearchIndexed(df, index, direction))
+            worker.signals.error.connect(lambda text: QMessageBox.warning(self, "Error", f"Search failed:\n {text}"))
+            self.my_status.showMessage("Indexing text of cells...")
+            self.start_worker(worker)
+        elif query == self.search_query:
+            self.show_hit(direction)
+        else:
+            index = self.search_index
+            worker = Worker(index.find, query)
+            worker.signals.result.connect(lambda hits: self.onSearchDone(index, query, hits, direction))
+            self.start_worker(worker)
+
+    def onSearchIndexed(self, df, index, direction: str) -> None:
+        if df is not self.df:
+            return
+        self.search_index = index
+        self.my_status.clearMessage()
+        self.onFind(direction)
+
+    def onSearchDone(self, index, query: str, hits, direction: str) -> None:
+        if index is not self.search_index:
+            return
+        self.search_query = query
+        self.search_hits = hits
+        self.model.setSearchHits(hits)
+        self.show_hit(direction)
+
+    def show_hit(self, direction: str) -> None:
+        """ Go to the next/previous cell with search hit (in view order), number of hits in statusbar """
+        from search import view_hits, next_hit
+
+        if self.search_hits is None:
+            return
+        hits = view_hits(self.search_hits, self.model.viewRows())
+        self.my_status.showMessage(f"Found: {len(hits)} cells", 5000)
+        if direction == 'all' or len(hits) == 0:
+            return
+        current = self.table.currentIndex()
+        row, col = (current.row(), current.column()) if current.isValid() else (-1, 0)
+        row, col = next_hit(hits, row, col, backward=direction == 'previous')
+        index = self.model.index(row, col)
+        self.table.setCurrentIndex(index)
+        self.table.scrollTo(index)
+
+    def onFilterClear(self) -> None:
+        """ Show all rows (in sort order) """
+        self.filter_edit.setEditText('')
+        self.filter_expression = ''
+        if self.df is not None and self.filter_mask is not None:
+            self.filter_mask = None
+            self.update_view()
+
+    def onHeaderClicked(self, col: int) -> None:
+        """ Sort rows by column (shift + click - by next column), only data loaded to memory """
+        if self.df is None or self.stream_worker is not None:
+            return
+        extend = bool(QtWidgets.QApplication.keyboardModifiers() & Qt.ShiftModifier)
+        from sorting import next_sort_keys
+
+        self.sort_keys = next_sort_keys(self.sort_keys, col, extend)
+        self.apply_sort(self.sort_keys)
+
+    def apply_sort(self, keys: list) -> None:
+        """ Show rows in order of sort keys, permutation is computed in background thread
+            (cached for every sort key) """
+        header = self.table.horizontalHeader()
+        header.setSortIndicatorShown(len(keys) > 0)
+        if not keys:
+            self.update_view()
+            return
+        header.setSortIndicator(keys[0][0], Qt.AscendingOrder if keys[0][1] else Qt.DescendingOrder)
+        key = tuple(keys)
+        order = self.sort_orders.get(key)
+        if order is not None:
+            self.onSorted(self.df, key, order)
+            return
+        import sorting
+
+        df = self.df
+        worker = Worker(sorting.sort_order, df.copy(deep=False), keys)
+        worker.signals.result.connect(lambda order: self.onSorted(df, key, order))
+        worker.signals.error.connect(lambda text: QMessageBox.warning(self, "Error", f"Sorting failed:\n {text}"))
+        self.my_status.showMessage("Sorting...")
+        self.start_worker(worker)
+
+    def onSorted(self, df, key: tuple, order) -> None:
+        if df is not self.df:
+            return
+        self.sort_orders.put(key, order)
+        if tuple(self.sort_keys) == key:
+            self.update_view()
+            names = ", ".join(f"{df.columns[col]} {'↑' if ascending else '↓'}" for col, ascending in key)
+            self.my_status.showMessage(f"Sorted by: {names}", 5000)
+
+    def data_shape(self) -> tuple:
+        """ number of rows and columns of current data """
+        if self.source is not None:
+            return self.source.shape
+        if self.row_mask is not None:
+            return int(self.row_mask.sum()), self.df.shape[1]
+        return self.df.shape
+
+    def data_chunks(self, chunksize=100000):
+        """ Current data as chunks of data frame - read from disk in lazy mode,
+            in memory data frame is taken as snapshot, so it can be used in other thread """
+        if self.source is not None:
+            return self.source.iter_chunks(chunksize)
+        from loader import frame_chunks
+
+        if self.row_mask is not None:
+            return self.kept_chunks(self.df.copy(deep=False), self.row_mask.nonzero()[0], chunksize)
+        return frame_chunks(self.df.copy(deep=False), chunksize)
+
+    def cancel_load(self) -> None:
+        """ Cancel loading in progress (file, API response streamed into tableview or import of links),
+            its results are ignored """
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+        self.load_worker = None
+        self.stream_worker = None
+
+    @staticmethod
+    def kept_chunks(df, positions, chunksize=100000):
+        """ rows of data frame (positions) as chunks, data frame is not copied as a whole """
+        yield df.iloc[positions[:chunksize]]
+        for start in range(chunksize, len(positions), chunksize):
+            yield df.iloc[positions[start:start + chunksize]]
+
+    def onCsvLoadError(self, worker, file_name: str) -> None:
+        if worker is not self.load_worker:
+            return
+        self.load_worker = None
+        self.my_status.clearMessage()
+        QMessageBox.warning(self, 'Error', f"Error loading the file:\n {file_name}")
+
+    def onCsvLoadCancelled(self, worker) -> None:
+        if worker is self.load_worker:
+            self.load_worker = None
+            if self.stream_worker is worker:
+                # rows received so far stay in tableview
+                self.stream_worker = None
+                self.df = self.model.streamedFrame()
+                self.model.appendRows(self.df)
+                self.setButtons(True)
+            self.my_status.showMessage("Loading cancelled", 3000)
+
+    def start_worker(self, worker) -> None:
+        """ Run cancellable worker in thread pool, progress is shown in statusbar """
+        worker.signals.progress.connect(lambda value: self.onWorkerProgress(worker, value))
+        worker.signals.status.connect(lambda status: self.onWorkerStatus(worker, status))
+        self.jobs.append(worker)
+        self.job_progress[worker] = 0
+        self.button_cancel.setEnabled(True)
+        self.update_progress()
+        self.threadpool.start(worker)
+
+    def onWorkerProgress(self, worker, value: int) -> None:
+        self.job_progress[worker] = value
+        self.update_progress()
+
+    def onWorkerStatus(self, worker, status: bool) -> None:
+        """ Worker finished - remove from list of running jobs """
+        if not status and worker in self.jobs:
+            self.jobs.remove(worker)
+            del self.job_progress[worker]
+        self.button_cancel.setEnabled(len(self.jobs) > 0)
+        self.update_progress()
+
+    def onCancel(self) -> None:
+        """ Cancel all running tasks """
+        for worker in self.jobs:
+            worker.cancel()
 
     def setButtons(self, state: bool) -> None:
         """ Set state of buttons/actions """
@@ -410,7 +928,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.button_sqlite.setEnabled(state)
         self.button_html.setEnabled(state)
         self.button_csv.setEnabled(state)
-        self.button_nan.setEnabled(state)
+        # rows can be removed (or filtered) only from data loaded to memory
+        self.button_nan.setEnabled(state and self.source is None)
+        self.button_restore.setEnabled(state and self.row_mask is not None)
+        self.update_undo_actions(state)
+        self.filter_bar.setEnabled(state and self.source is None)
+        self.button_find.setEnabled(state and self.source is None)
         self.button_mark.setEnabled(state)
 
     def onResizeColumns(self) -> None:
@@ -419,15 +942,45 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def onToolbarCloseButtonClick(self) -> None:
         """Clear tableview, set statusbar and disable toolbar close, summary and info icons"""
+        # file (or API response) still loading is not shown after close
+        self.cancel_load()
         self.table.setModel(None)
         self.df = None
+        self.source = None
+        self.model = None
+        self.stats_cache = None
+        self.info_data = None
+        self.reset_view()
         self.setButtons(False)
         self.setWindowTitle(self.app_title)
         self.labelStatus.setText("Rows: 0 Cols: 0")
 
     def onToolbarSummaryButtonClick(self) -> None:
         """Show Summary dialog"""
-        dlg = SummaryDialog(self.df.describe())
+        from summary import SummaryDialog
+        from stats import numeric_columns
+
+        # dialog is shown at once, columns without cached statistics are filled in by worker
+        if self.source is not None:
+            # numeric columns from first rows, whole file is read in one pass (later text is flagged)
+            columns = numeric_columns(self.source.read_rows(0, 1000))
+            names = [str(self.source.columns[col]) for col in columns]
+        else:
+            columns = numeric_columns(self.df)
+            names = [str(self.df.columns[col]) for col in columns]
+        missing = self.stats_cache.missing(columns)
+        dlg = SummaryDialog(self.stats_cache.frame(columns, names), columns, missing)
+        if missing:
+            cache = self.stats_cache
+            accuracy = self.settings.value('summary_accuracy', 'medium')
+            if self.source is not None or self.row_mask is not None:
+                worker = StatsWorker(self.data_chunks(), missing, self.data_shape()[0], accuracy)
+            else:
+                worker = StatsWorker(self.df.copy(deep=False), missing, accuracy=accuracy)
+            worker.signals.partial.connect(lambda item: cache.put(*item))
+            worker.signals.partial.connect(dlg.model.setColumn)
+            worker.signals.error.connect(lambda text: QMessageBox.warning(self, "Error", f"Summary failed:\n {text}"))
+            self.start_worker(worker)
         dlg.setWindowTitle("Summary")
         dlg.exec_()
 
@@ -436,8 +989,36 @@ class MainWindow(QtWidgets.QMainWindow):
         # buf = io.StringIO()
         # self.df.info(buf=buf)
         # tmp = buf.getvalue()
+        if self.info_data is not None:
+            self.showInfo(self.info_data)
+            return
 
-        dlg = InfoDialog(self.df)
+        # computed in background, result is kept until data changes
+        import info
+
+        if self.source is not None or self.row_mask is not None:
+            worker = Worker(info.table_info, self.data_chunks(), self.data_shape()[0])
+        else:
+            worker = Worker(info.table_info, self.df.copy(deep=False))
+        model, row_mask = self.model, self.row_mask
+        worker.signals.result.connect(lambda data: self.onInfoReady(model, row_mask, data))
+        worker.signals.error.connect(lambda text: QMessageBox.warning(self, "Error", f"Info failed:\n {text}"))
+        self.my_status.showMessage("Computing info...")
+        self.start_worker(worker)
+
+    def onInfoReady(self, model, row_mask, data) -> None:
+        if model is not self.model or row_mask is not self.row_mask:
+            # other file was loaded or rows were removed / restored in the meantime
+            return
+        self.my_status.clearMessage()
+        self.info_data = data
+        self.showInfo(data)
+
+    def showInfo(self, data) -> None:
+        from info import InfoDialog
+
+        c_tab, memory = data
+        dlg = InfoDialog(c_tab, memory)
         dlg.setWindowTitle("Info")
         dlg.exec_()
 
@@ -445,43 +1026,199 @@ class MainWindow(QtWidgets.QMainWindow):
         """ Export data to xlsx file """
         file_name, _ = QFileDialog.getSaveFileName(self, 'Export to xlsx', '', ".xlsx(*.xlsx)")
         if file_name:
-            self.df.to_excel(file_name, engine='xlsxwriter')
+            self.start_export('xlsx', file_name)
 
     def onExportSQLite(self) -> None:
-        file_name, _ = QFileDialog.getSaveFileName(self, 'Export to sqlite db', '', ".sqlite(*.sqlite)")
-        if file_name:
-            engine = create_engine(f'sqlite:///{file_name}', echo=False)
-            self.df.to_sql('csv_data', con=engine)
+        """ Export data to table in SQLite database (new or existing) """
+        file_name, _ = QFileDialog.getSaveFileName(self, 'Export to sqlite db', '', ".sqlite(*.sqlite)",
+                                                   options=QFileDialog.DontConfirmOverwrite)
+        if not file_name:
+            return
+
+        table, result = QInputDialog.getText(self, "Export to sqlite db", "Table name:", text='csv_data')
+        if not result or not table:
+            return
+
+        if_exists = 'fail'
+        if os.path.isfile(file_name):
+            import sqlite3
+
+            try:
+                con = sqlite3.connect(file_name)
+                exists = con.execute("SELECT count(*) FROM sqlite_master WHERE type='table' AND name=?",
+                                     (table,)).fetchone()[0] > 0
+                con.close()
+            except sqlite3.DatabaseError:
+                QMessageBox.warning(self, 'Error', f"Not a SQLite database:\n {file_name}")
+                return
+            if exists:
+                box = QMessageBox(QMessageBox.Question, "Export to sqlite db",
+                                  f"Table '{table}' already exists.", parent=self)
+                button_replace = box.addButton("Replace", QMessageBox.AcceptRole)
+                button_append = box.addButton("Append", QMessageBox.AcceptRole)
+                box.addButton(QMessageBox.Cancel)
+                box.exec_()
+                if box.clickedButton() == button_replace:
+                    if_exists = 'replace'
+                elif box.clickedButton() == button_append:
+                    if_exists = 'append'
+                else:
+                    return
+
+        batch_size = self.settings.value('sqlite_batch_size', 50000, int)
+        self.start_export('sqlite', file_name, chunksize=batch_size, table=table, if_exists=if_exists,
+                          batch_size=batch_size)
 
     def onExportHTML(self) -> None:
         """ Export data to HTML file """
         file_name, _ = QFileDialog.getSaveFileName(self, 'Export to HTML file', '', ".html(*.html)")
         if file_name:
-            self.df.to_html(file_name)
+            self.start_export('html', file_name)
 
     def onExportCSV(self) -> None:
         """ Export data to new CSV file """
         file_name, _ = QFileDialog.getSaveFileName(self, 'Export to CSV file', '', ".csv(*.csv)")
         if file_name:
-            self.df.to_csv(file_name, sep=',', decimal='.')
+            self.start_export('csv', file_name)
+
+    def start_export(self, file_format: str, file_name: str, chunksize=10000, **kwargs) -> None:
+        """ Export snapshot of current data in background thread, several exports can run at once,
+            kwargs - options of exporter """
+        worker = ExportWorker(file_format, file_name, self.data_chunks(chunksize), self.data_shape()[0], **kwargs)
+        worker.signals.message.connect(self.my_status.showMessage)
+        worker.signals.result.connect(lambda name: self.my_status.showMessage(f"Exported: {name}", 5000))
+        worker.signals.error.connect(lambda text: QMessageBox.warning(self, "Error", f"Export failed:\n {text}"))
+        worker.signals.cancelled.connect(lambda: self.my_status.showMessage(f"Export cancelled: {file_name}", 5000))
+        self.start_worker(worker)
 
     def onImportFromAPI(self) -> None:
+        from apiparam import ApiDialog
+
         dlg = ApiDialog()
         dlg.setWindowTitle("Import a Data CSV via API")
-        if dlg.exec_():
-            file_name = dlg.filename.text()
-            address = dlg.address.text()
+        if not dlg.exec_():
+            return
+        if dlg.links:
+            self.import_links(dlg.links, dlg.folder)
+            return
+
+        file_name = dlg.filename.text()
+        address = dlg.address.text()
+        if address and dlg.direct.isChecked():
+            self.load_api_stream(address, file_name or None)
+        elif file_name and address:
+            # downloaded in background, file is opened when download is complete
+            worker = DownloadWorker(address, file_name, cache=self.http_cache())
+            worker.signals.message.connect(lambda text: self.my_status.showMessage(text, 5000))
+            worker.signals.result.connect(self.onDownloaded)
+            worker.signals.error.connect(lambda text: QMessageBox.warning(self, "Error", text))
+            worker.signals.cancelled.connect(lambda: self.my_status.showMessage("Download cancelled", 5000))
+            self.my_status.showMessage(f"Downloading: {address}")
+            self.start_worker(worker)
+
+    def onDownloaded(self, file_name: str) -> None:
+        self.onOpenRecentFile(file_name)
+
+    def load_api_stream(self, address: str, file_name=None) -> None:
+        """ Parse API response while it is downloaded, rows are shown in tableview as they arrive,
+            file_name - optional copy of response saved on the way """
+        self.cancel_load()
+        worker = ApiStreamWorker(address, file_name, cache=self.http_cache())
+        worker.signals.message.connect(lambda text: self.my_status.showMessage(text, 5000))
+        worker.signals.partial.connect(lambda chunk: self.onApiRows(worker, address, chunk))
+        worker.signals.result.connect(lambda df: self.onApiLoaded(worker, address, df, file_name))
+        worker.signals.error.connect(lambda text: self.onApiLoadError(worker, text))
+        worker.signals.cancelled.connect(lambda: self.onCsvLoadCancelled(worker))
+        self.load_worker = worker
+        self.my_status.showMessage(f"Loading: {address}")
+        self.start_worker(worker)
+
+    def onApiRows(self, worker, address: str, chunk) -> None:
+        """ Next rows parsed from API response - appended to tableview """
+        if worker is not self.load_worker:
+            return
+        if self.stream_worker is not worker:
+            # first rows replace current data, features are enabled when loading is complete
+            self.stream_worker = worker
+            self.show_data(chunk, address)
+            self.setButtons(False)
+        elif self.model is not None and chunk.shape[0] > 0:
+            # chunk is shared with worker, data frame is concatenated once when loading is complete
+            self.model.appendChunk(chunk)
+            self.labelStatus.setText(f"Rows: {self.model.rowCount(None)} Cols: {chunk.shape[1]}")
+
+    def onApiLoaded(self, worker, address: str, df, file_name=None) -> None:
+        if worker is not self.load_worker:
+            return
+        if self.stream_worker is not worker:
+            # no rows were parsed
+            self.onCsvLoaded(worker, address, df, {})
+        elif self.model is None:
+            return
         else:
-            file_name = None
-
-        if file_name and address:
-            res, text = dataload.import_data_by_api(address)
-            if res:
-                with open(file_name, "w") as f:
-                    f.write(text)
-                self.onOpenRecentFile(file_name)
-            else:
-                QMessageBox.warning(self, "Error", text)
+            self.load_worker = None
+            self.stream_worker = None
+            self.df = df
+            self.model.appendRows(df)
+            self.labelStatus.setText(f"Rows: {df.shape[0]} Cols: {df.shape[1]}")
+            self.setButtons(True)
+            # report of http cache stays
+            if self.my_status.currentMessage().startswith("Loading"):
+                self.my_status.clearMessage()
+        if file_name:
+            self.my_status.showMessage(f"Saved: {file_name}", 5000)
+
+    def onApiLoadError(self, worker, text: str) -> None:
+        if worker is not self.load_worker:
+            return
+        self.load_worker = None
+        if self.stream_worker is worker:
+            # rows received before error stay in tableview
+            self.stream_worker = None
+            self.df = self.model.streamedFrame()
+            self.model.appendRows(self.df)
+            self.setButtons(True)
+        self.my_status.clearMessage()
+        QMessageBox.warning(self, 'Error', f"Error loading data from API:\n {text}")
+
+    def import_links(self, links: list, folder=None) -> None:
+        """ Import many api links at once in background: to CSV files in folder or (folder is None)
+            to one table with source column shown in tableview """
+        import dataload
+
+        worker = Worker(dataload.fetch_many, links, folder, cache=self.http_cache())
+        if folder is None:
+            self.cancel_load()
+            self.load_worker = worker
+        worker.signals.result.connect(lambda data: self.onLinksImported(worker, folder, data))
+        worker.signals.error.connect(lambda text: self.onLinksImportError(worker, text))
+        worker.signals.cancelled.connect(lambda: self.onLinksImportCancelled(worker))
+        self.my_status.showMessage(f"Importing {len(links)} links...")
+        self.start_worker(worker)
+
+    def onLinksImported(self, worker, folder, data) -> None:
+        import dataload
+
+        if folder is None and worker is not self.load_worker:
+            # other data was loaded in the meantime
+            return
+        results, df = data
+        self.my_status.clearMessage()
+        if df is not None:
+            self.onCsvLoaded(worker, f"API import ({len(results)} links)", df, {})
+        elif folder is None:
+            self.load_worker = None
+        QMessageBox.information(self, "Import selected", dataload.import_report(results))
+
+    def onLinksImportError(self, worker, text: str) -> None:
+        if worker is self.load_worker:
+            self.load_worker = None
+        QMessageBox.warning(self, "Error", f"Import failed:\n {text}")
+
+    def onLinksImportCancelled(self, worker) -> None:
+        if worker is self.load_worker:
+            self.load_worker = None
+        self.my_status.showMessage("Import cancelled", 5000)
 
     def closeEvent(self, event) -> None:
         """ Quit application, ask user before """
@@ -499,6 +1236,8 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def about(self) -> None:
         """ Show About dialog (info about application)"""
+        from about import AboutDialog
+
         dlg = AboutDialog()
         dlg.exec_()
 
@@ -557,42 +1296,149 @@ class MainWindow(QtWidgets.QMainWindow):
             self.toolbar.hide()
 
     def onSettings(self):
-        """ Round numbers to """
-        n, result = QInputDialog.getInt(self, "Settings", "Round numbers to:", self.round_num, 0, 10, 1)
-        if result and n != self.round_num:
-            self.round_num = n
-            self.settings.setValue('round_numbers', self.round_num)
-            if self.df.shape[0] > 0:
-                index = self.table.currentIndex()
-                self.model = TableModel(self.df, self.round_num)
-                self.table.setModel(self.model)
-                self.table.selectRow(index.row())
+        """ Application settings: round numbers, export, cache of parsed files """
+        from settings import SettingsDialog
+
+        values = {
+            'round_numbers': self.round_num,
+            'sqlite_batch_size': self.settings.value('sqlite_batch_size', 50000, int),
+            'summary_accuracy': self.settings.value('summary_accuracy', 'medium'),
+            'parse_cache': self.settings.value('parse_cache', True, bool),
+            'cache_size_mb': self.settings.value('cache_size_mb', 1024, int),
+            'http_cache_ttl': self.settings.value('http_cache_ttl', 60, int),
+            'http_cache_size_mb': self.settings.value('http_cache_size_mb', 100, int),
+            'history_size_mb': self.settings.value('history_size_mb', 64, int),
+        }
+        dlg = SettingsDialog(values, self.cache or (ParseCache() if cache_available() else None))
+        dlg.setWindowTitle("Settings")
+        if dlg.exec_():
+            for key, value in dlg.values().items():
+                self.settings.setValue(key, value)
+            self.cache = self.parse_cache()
+            if self.cache is not None:
+                self.cache.evict()
+            self.history.max_bytes = dlg.values()['history_size_mb'] * MB
+            self.history.evict()
+            self.update_undo_actions(self.button_close.isEnabled())
+            if values['summary_accuracy'] != dlg.values()['summary_accuracy'] and self.stats_cache is not None:
+                # statistics computed with other accuracy (results of running worker go to old cache)
+                from stats import StatsCache
+
+                self.stats_cache = StatsCache()
+
+            n = dlg.values()['round_numbers']
+            if n != self.round_num:
+                self.round_num = n
+                if self.model is not None:
+                    self.model.setRoundNum(self.round_num)
+                # text of numbers changed
+                self.reset_search()
+
+    def parse_cache(self):
+        """ cache of parsed csv files, None when disabled in settings or pyarrow is not installed """
+        if not cache_available() or not self.settings.value('parse_cache', True, bool):
+            return None
+        return ParseCache(max_size=self.settings.value('cache_size_mb', 1024, int) * MB)
+
+    def http_cache(self):
+        """ cache of api downloads (conditional GET) """
+        from httpcache import HttpCache
+
+        return HttpCache(ttl=self.settings.value('http_cache_ttl', 60, int) * 60,
+                         max_size=self.settings.value('http_cache_size_mb', 100, int) * MB)
 
     def onRemoveNaN(self):
-        """ Remove rows with missing values """
-        if self.df.shape[0] > 0:
-            button = QMessageBox.question(self, "Remove NaN", "Remove rows with missing values?")
-            if button == QMessageBox.Yes:
-                self.df.dropna(axis=0, how='any', inplace=True)
-                self.model = TableModel(self.df, self.round_num)
-                self.table.setModel(self.model)
-                self.table.selectRow(0)
-                self.labelStatus.setText(f"Rows: {self.df.shape[0]} Cols: {self.df.shape[1]}")
+        """ Remove rows with missing values in selected columns - rows are hidden in view, data frame
+            is not changed, so removed rows can be restored """
+        import numpy as np
+        from nanparam import NanDialog
+
+        if self.data_shape()[0] == 0:
+            return
+        current = self.row_mask if self.row_mask is not None else np.ones(self.df.shape[0], dtype=bool)
+        # mask of missing values shown in red, no new pass over data frame
+        nan = self.model.nanMask()
+        counts = nan.sum(axis=0) if self.row_mask is None else nan[current].sum(axis=0)
+        dlg = NanDialog([str(name) for name in self.df.columns], counts.tolist())
+        dlg.setWindowTitle("Remove NaN")
+        if not dlg.exec_() or not dlg.columns():
+            return
+        removed = current & nan[:, dlg.columns()].any(axis=1)
+        if not removed.any():
+            self.my_status.showMessage("No rows with missing values", 5000)
+            return
+        self.history.push("Remove NaN", self.data_state())
+        # statistics change only in columns with values in removed rows
+        affected = np.flatnonzero((~nan[removed]).any(axis=0)).tolist()
+        self.stats_cache = self.stats_cache.copy()
+        self.stats_cache.invalidate(affected)
+        self.info_data = None
+        self.row_mask = current & ~removed
+        rows = self.model.viewRows()
+        self.model.hideRows(np.flatnonzero(removed if rows is None else removed[rows]))
+        self.show_row_count()
+        self.button_restore.setEnabled(True)
+        self.update_undo_actions()
+        self.my_status.showMessage(f"Removed rows: {int(removed.sum())}", 5000)
+
+    def onRestoreRows(self):
+        """ Show rows removed by Remove NaN again """
+        from stats import StatsCache
+
+        if self.df is None or self.row_mask is None:
+            return
+        self.history.push("Restore removed rows", self.data_state())
+        self.set_data_state((None, StatsCache(), None))
+
+    def data_state(self) -> tuple:
+        """ State of current data kept in undo history: mask of rows (arrays are never changed in place,
+            new mask is created by every operation), statistics and info of these rows """
+        return self.row_mask, self.stats_cache, self.info_data
+
+    def set_data_state(self, state: tuple) -> None:
+        """ Restore state of current data (undo / redo), data frame is not copied """
+        self.row_mask, self.stats_cache, self.info_data = state
+        self.update_view()
+        self.button_restore.setEnabled(self.row_mask is not None)
+        self.update_undo_actions()
+
+    def onUndo(self) -> None:
+        if self.df is None:
+            return
+        result = self.history.undo(self.data_state())
+        if result is not None:
+            label, state = result
+            self.set_data_state(state)
+            self.my_status.showMessage(f"Undo: {label}", 5000)
+
+    def onRedo(self) -> None:
+        if self.df is None:
+            return
+        result = self.history.redo(self.data_state())
+        if result is not None:
+            label, state = result
+            self.set_data_state(state)
+            self.my_status.showMessage(f"Redo: {label}", 5000)
+
+    def update_undo_actions(self, state=True) -> None:
+        """ Enable undo / redo when history has operations, label of operation in action text """
+        state = state and self.df is not None
+        undo_label, redo_label = self.history.undo_label(), self.history.redo_label()
+        self.button_undo.setEnabled(state and undo_label is not None)
+        self.button_undo.setText(f"Undo {undo_label}" if undo_label else "Undo")
+        self.button_redo.setEnabled(state and redo_label is not None)
+        self.button_redo.setText(f"Redo {redo_label}" if redo_label else "Redo")
 
     def onExportMarkdown(self):
-        """ export to markdown table in thread """
+        """ Export data to markdown table """
         file_name, _ = QFileDialog.getSaveFileName(self, 'Export to Markdown file', '', ".md(*.md)")
         if file_name:
-            worker = MarkdownWorker(file_name, self.df)
-            worker.signals.progress.connect(self.update_progress)
-            worker.signals.status.connect(self.update_status)
-            self.threadpool.start(worker)
-
-    def update_progress(self, progress):
-        self.progress.setValue(progress)
+            self.start_export('md', file_name)
 
-    def update_status(self, status):
-        if status:
+    def update_progress(self) -> None:
+        """ Show mean progress of running tasks in statusbar """
+        if self.jobs:
+            self.progress.setValue(int(sum(self.job_progress.get(worker, 0) for worker in self.jobs) / len(self.jobs)))
             self.progress.show()
         else:
             self.progress.hide()
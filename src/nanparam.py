@@ -0,0 +1,52 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QVBoxLayout, QGroupBox, QListWidget, QListWidgetItem, \
+    QPushButton, QHBoxLayout, QLabel
+
+
+class NanDialog(QDialog):
+    """ columns which must not have missing values, rows with NaN in any of them are removed """
+
+    def __init__(self, columns: list, nan_counts: list):
+        super().__init__()
+        self.setMinimumSize(360, 300)
+        QBtn = QDialogButtonBox.Ok | QDialogButtonBox.Cancel
+        self.buttonBox = QDialogButtonBox(QBtn)
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+
+        self.layout = QVBoxLayout()
+
+        groupbox = QGroupBox("Remove rows with missing values in columns:")
+        self.layout.addWidget(groupbox)
+        layout_columns = QVBoxLayout()
+        groupbox.setLayout(layout_columns)
+
+        self.list = QListWidget()
+        for name, count in zip(columns, nan_counts):
+            item = QListWidgetItem(f"{name} (NaN: {count})")
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            # columns without NaN do not change result
+            item.setCheckState(Qt.Checked if count > 0 else Qt.Unchecked)
+            self.list.addItem(item)
+        layout_columns.addWidget(self.list)
+
+        layout_buttons = QHBoxLayout()
+        btn_all = QPushButton("Select all")
+        btn_all.clicked.connect(lambda: self.setAll(Qt.Checked))
+        layout_buttons.addWidget(btn_all)
+        btn_none = QPushButton("Select none")
+        btn_none.clicked.connect(lambda: self.setAll(Qt.Unchecked))
+        layout_buttons.addWidget(btn_none)
+        layout_columns.addLayout(layout_buttons)
+        layout_columns.addWidget(QLabel("Removed rows can be restored (File -> Restore removed rows)."))
+
+        self.layout.addWidget(self.buttonBox)
+        self.setLayout(self.layout)
+
+    def setAll(self, state) -> None:
+        for i in range(self.list.count()):
+            self.list.item(i).setCheckState(state)
+
+    def columns(self) -> list:
+        """ positions of checked columns """
+        return [i for i in range(self.list.count()) if self.list.item(i).checkState() == Qt.Checked]
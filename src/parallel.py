@@ -0,0 +1,143 @@
+import io
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+import rowindex
+from loader import CancelledError, read_options
+
+MIN_PART_SIZE = 16 * 1024 * 1024
+
+
+def mp_context():
+    """ processes are not forked from application with running threads (Qt, workers), forkserver
+        (with preloaded modules) or spawn is used instead """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['parallel'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def quote_parity(file_name: str, positions: list, block_size=1 << 24) -> list:
+    """ for every (sorted) position: True when it lies inside quoted field,
+        one streaming pass counting quotes, no per-row data is kept """
+    result = []
+    quotes = 0
+    position = 0
+    targets = list(positions)
+    with open(file_name, 'rb') as f:
+        while targets:
+            block = f.read(block_size)
+            if not block:
+                break
+            arr = np.frombuffer(block, dtype=np.uint8)
+            while targets and targets[0] < position + len(block):
+                before = np.count_nonzero(arr[:targets[0] - position] == rowindex.QUOTE)
+                result.append((quotes + before) % 2 == 1)
+                targets.pop(0)
+            quotes += np.count_nonzero(arr == rowindex.QUOTE)
+            position += len(block)
+    return result + [quotes % 2 == 1] * len(targets)
+
+
+def next_row_start(file_name: str, position: int, in_quotes: bool, block_size=1 << 20) -> int:
+    """ first row boundary (position after newline outside quotes) at or after position """
+    with open(file_name, 'rb') as f:
+        f.seek(position)
+        while True:
+            block = f.read(block_size)
+            if not block:
+                return position
+            arr = np.frombuffer(block, dtype=np.uint8)
+            newlines = np.flatnonzero(arr == rowindex.NEWLINE)
+            quotes = np.flatnonzero(arr == rowindex.QUOTE)
+            parity = (np.searchsorted(quotes, newlines) + int(in_quotes)) % 2
+            boundaries = newlines[parity == 0]
+            if len(boundaries) > 0:
+                return position + int(boundaries[0]) + 1
+            in_quotes = (len(quotes) + int(in_quotes)) % 2 == 1
+            position += len(block)
+
+
+def data_start(file_name: str, header=True) -> int:
+    """ position of the first data row """
+    if not header:
+        return 0
+    return next_row_start(file_name, 0, False)
+
+
+def split_ranges(file_name: str, parts: int, header=True) -> list:
+    """ byte ranges (start, stop) of data rows, split on row boundaries (newlines in quoted
+        fields are respected) into parts of similar size, sidecar row index is used when present """
+    size = os.path.getsize(file_name)
+    start = data_start(file_name, header)
+    if start >= size:
+        return []
+    targets = [int(start + (size - start) * i / parts) for i in range(1, parts)]
+    if rowindex.has_row_offsets(file_name):
+        offsets = rowindex.load_row_offsets(file_name)
+        cuts = [int(offsets[i]) if i < len(offsets) else size for i in np.searchsorted(offsets, targets)]
+    else:
+        cuts = [next_row_start(file_name, target, in_quotes)
+                for target, in_quotes in zip(targets, quote_parity(file_name, targets))]
+    cuts = sorted(set([start] + cuts + [size]))
+    return [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if a < b]
+
+
+def parse_range(file_name: str, start: int, stop: int, options: dict):
+    """ parse rows in byte range of file (run in worker process) """
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        raw = f.read(stop - start)
+    return pd.read_csv(io.BytesIO(raw), **options)
+
+
+def read_csv_parallel(file_name: str, sep=',', decimal='.', header=True, index=True, workers=None,
+                      min_part_size=MIN_PART_SIZE, progress=None, cancelled=None):
+    """ parse csv file in worker processes, file is split on row boundaries into byte ranges
+        (one per worker, at least min_part_size bytes), every process reads and parses its own range """
+    options = read_options(sep, decimal, header, index)
+    head = pd.read_csv(file_name, nrows=0 if header else 1, **options)
+    part_options = dict(options)
+    part_options['header'] = None
+    names = list(head.columns)
+    if index:
+        names.insert(0, head.index.name)
+    part_options['names'] = names
+
+    size = os.path.getsize(file_name)
+    workers = workers or os.cpu_count() or 1
+    parts = max(1, min(workers, size // max(1, min_part_size)))
+    ranges = split_ranges(file_name, parts, header)
+    if not ranges:
+        return head.iloc[:0]
+
+    if len(ranges) == 1:
+        df = parse_range(file_name, ranges[0][0], ranges[0][1], part_options)
+        if progress is not None:
+            progress(100)
+        return df
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=mp_context()) as executor:
+        futures = {executor.submit(parse_range, file_name, start, stop, part_options): number
+                   for number, (start, stop) in enumerate(ranges)}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            if cancelled is not None and cancelled():
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise CancelledError()
+            for future in done:
+                results[futures[future]] = future.result()
+            if progress is not None:
+                progress(int(100 * len(results) / len(ranges)))
+
+    chunks = [results[number] for number in range(len(ranges))]
+    df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+    if not index:
+        df.index = pd.RangeIndex(df.shape[0])
+    return df
+
@@ -0,0 +1,142 @@
+import os
+import hashlib
+import struct
+import numpy as np
+from loader import CancelledError
+
+NEWLINE = ord('\n')
+QUOTE = ord('"')
+
+
+def scan_row_offsets(file_name: str, start=0, in_quotes=False, block_size=1 << 24, progress=None, cancelled=None):
+    """ return (offsets, in_quotes) - byte offsets of the beginning of every row after position start
+        (start itself included), newlines inside quoted fields are skipped;
+        in_quotes - quoting state at position start and at the end of the file """
+    size = os.path.getsize(file_name)
+    parts = [np.array([start], dtype=np.uint64)]
+    position = start
+    with open(file_name, 'rb') as f:
+        f.seek(start)
+        while True:
+            if cancelled is not None and cancelled():
+                raise CancelledError()
+            block = f.read(block_size)
+            if not block:
+                break
+            arr = np.frombuffer(block, dtype=np.uint8)
+            newlines = np.flatnonzero(arr == NEWLINE)
+            quotes = np.flatnonzero(arr == QUOTE)
+            if len(quotes) > 0:
+                # newline ends the row only if the number of quotes before it is even
+                parity = (np.searchsorted(quotes, newlines) + int(in_quotes)) % 2
+                newlines = newlines[parity == 0]
+                in_quotes = (len(quotes) + int(in_quotes)) % 2 == 1
+            elif in_quotes:
+                newlines = newlines[:0]
+            parts.append(newlines.astype(np.uint64) + np.uint64(position + 1))
+            position += len(block)
+            if progress is not None and size > 0:
+                progress(min(100, int(100 * position / size)))
+
+    offsets = np.concatenate(parts)
+    # no row starts after the last newline
+    if len(offsets) > 0 and offsets[-1] >= size:
+        offsets = offsets[:-1]
+    return offsets, in_quotes
+
+
+# sidecar index: 64 bytes of header (magic, size and mtime of csv file, quoting state at the end,
+# sha1 of the last bytes of the file) followed by uint64 offsets of rows
+INDEX_FOLDER = os.path.join(os.path.expanduser("~"), '.config', 'CSV_Viewer', 'index')
+HEADER = struct.Struct('<8sQQQ20s12x')
+MAGIC = b'CSVIDX01'
+TAIL_SIZE = 4096
+
+
+def index_path(file_name: str, folder=None) -> str:
+    """ path of sidecar index for csv file (in INDEX_FOLDER when folder is None) """
+    key = hashlib.sha1(os.path.abspath(file_name).encode('utf-8')).hexdigest()
+    return os.path.join(folder or INDEX_FOLDER, key + '.idx')
+
+
+def tail_hash(file_name: str, size: int) -> bytes:
+    """ sha1 of the last TAIL_SIZE bytes before position size """
+    with open(file_name, 'rb') as f:
+        f.seek(max(0, size - TAIL_SIZE))
+        return hashlib.sha1(f.read(size - max(0, size - TAIL_SIZE))).digest()
+
+
+def has_row_offsets(file_name: str, folder=None) -> bool:
+    """ sidecar index exists and is up to date """
+    path = index_path(file_name, folder)
+    if not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as f:
+        data = f.read(HEADER.size)
+    if len(data) != HEADER.size or data[:len(MAGIC)] != MAGIC:
+        return False
+    _, size, mtime, _, _ = HEADER.unpack(data)
+    stat = os.stat(file_name)
+    return size == stat.st_size and mtime == stat.st_mtime_ns
+
+
+def load_row_offsets(file_name: str, folder=None, progress=None, cancelled=None):
+    """ offsets of rows read from memory mapped sidecar index, index is built when missing or stale,
+        when the file was only appended to, only the new part of the file is scanned """
+    stat = os.stat(file_name)
+    path = index_path(file_name, folder)
+    header = None
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            data = f.read(HEADER.size)
+        if len(data) == HEADER.size and data[:len(MAGIC)] == MAGIC:
+            header = HEADER.unpack(data)
+
+    if header is not None:
+        _, size, mtime, old_in_quotes, digest = header
+        if size == stat.st_size and mtime == stat.st_mtime_ns:
+            return _map_offsets(path)
+
+        if stat.st_size > size and tail_hash(file_name, size) == digest:
+            # file was appended to - scan only new rows
+            offsets, in_quotes = scan_row_offsets(file_name, start=size, in_quotes=bool(old_in_quotes),
+                                                  progress=progress, cancelled=cancelled)
+            with open(file_name, 'rb') as f:
+                f.seek(size - 1)
+                ends_with_newline = size == 0 or f.read(1) == b'\n'
+            if not ends_with_newline or old_in_quotes:
+                offsets = offsets[1:]
+            _append_index(path, file_name, stat, in_quotes, offsets)
+            return _map_offsets(path)
+
+    offsets, in_quotes = scan_row_offsets(file_name, progress=progress, cancelled=cancelled)
+    _write_index(path, file_name, stat, in_quotes, offsets)
+    return _map_offsets(path)
+
+
+def _header(file_name: str, stat, in_quotes: bool) -> bytes:
+    return HEADER.pack(MAGIC, stat.st_size, stat.st_mtime_ns, int(in_quotes), tail_hash(file_name, stat.st_size))
+
+
+def _write_index(path: str, file_name: str, stat, in_quotes: bool, offsets) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_header(file_name, stat, in_quotes))
+        offsets.astype(np.uint64).tofile(f)
+    os.replace(tmp_path, path)
+
+
+def _append_index(path: str, file_name: str, stat, in_quotes: bool, offsets) -> None:
+    with open(path, 'r+b') as f:
+        f.seek(0, os.SEEK_END)
+        offsets.astype(np.uint64).tofile(f)
+        f.seek(0)
+        f.write(_header(file_name, stat, in_quotes))
+
+
+def _map_offsets(path: str):
+    """ offsets from index file as read-only memory map """
+    if os.path.getsize(path) == HEADER.size:
+        return np.zeros(0, dtype=np.uint64)
+    return np.memmap(path, dtype=np.uint64, mode='r', offset=HEADER.size)
@@ -0,0 +1,98 @@
+import numpy as np
+
+# separator of cells in text of column, never part of query or cell text
+SEPARATOR = '\n'
+
+
+class SearchIndex:
+    """ text of every cell as shown in table: one lowercase utf-8 buffer per column (cells separated
+        by newline) and start offsets of cells; query is searched with vectorized byte comparisons
+        over the whole column, offsets of matches are mapped to rows with binary search """
+
+    def __init__(self, texts: list, starts: list, shape: tuple):
+        self.texts = texts
+        self.starts = starts
+        self.shape = shape
+
+    def find_column(self, col: int, query: bytes) -> np.ndarray:
+        """ cells of column containing query (normalized, encoded) as boolean array """
+        data = np.frombuffer(self.texts[col], dtype=np.uint8)
+        size = len(data) - len(query) + 1
+        if size <= 0 or self.shape[0] == 0:
+            return np.zeros(self.shape[0], dtype=bool)
+        positions = np.flatnonzero(data[:size] == query[0])
+        for offset in range(1, len(query)):
+            positions = positions[data[positions + offset] == query[offset]]
+        # cell of every match (query never spans separator)
+        result = np.zeros(self.shape[0], dtype=bool)
+        result[np.searchsorted(self.starts[col], positions, side='right') - 1] = True
+        return result
+
+    def find(self, query: str, progress=None, cancelled=None) -> np.ndarray:
+        """ cells containing query (case insensitive) as boolean array (rows x columns) """
+        from loader import CancelledError
+
+        query = normalize(query).encode('utf-8')
+        mask = np.zeros(self.shape, dtype=bool)
+        if query:
+            for col in range(self.shape[1]):
+                if cancelled is not None and cancelled():
+                    raise CancelledError()
+                mask[:, col] = self.find_column(col, query)
+        if progress is not None:
+            progress(100)
+        return mask
+
+
+def normalize(text: str) -> str:
+    return text.replace(SEPARATOR, ' ').lower()
+
+
+def build_index(df, round_num: int, chunksize=100000, progress=None, cancelled=None) -> SearchIndex:
+    """ search index of data frame, cells formatted as in table (round_num decimal places) """
+    from formatter import ColumnFormatter
+    from loader import CancelledError
+
+    formatter = ColumnFormatter(df, round_num)
+    rows, cols = df.shape
+    texts = []
+    starts = []
+    for col in range(cols):
+        parts = []
+        for start in range(0, rows, chunksize):
+            if cancelled is not None and cancelled():
+                raise CancelledError()
+            cells = formatter.format_rows(col, start, start + chunksize)
+            if not formatter.is_numeric(col):
+                cells = map(normalize, cells)
+            parts.append(SEPARATOR.join(cells))
+        text = SEPARATOR.join(parts).encode('utf-8')
+        # cells start after separators
+        separators = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == ord(SEPARATOR))
+        texts.append(text)
+        starts.append(np.concatenate([[0], separators + 1]) if rows > 0 else np.empty(0, dtype=np.int64))
+        if progress is not None:
+            progress(int(100 * (col + 1) / max(1, cols)))
+    return SearchIndex(texts, starts, (rows, cols))
+
+
+def view_hits(mask, rows=None) -> np.ndarray:
+    """ cells with hits as (row of view, column) pairs in reading order, rows - positions of data rows
+        shown in view (None - all rows in data order) """
+    if rows is not None:
+        mask = mask[rows]
+    return np.argwhere(mask)
+
+
+def next_hit(hits, row: int, col: int, backward=False):
+    """ the first hit after (before) cell in reading order, search wraps around; None - no hits """
+    if len(hits) == 0:
+        return None
+    width = max(int(hits[:, 1].max()), col) + 1
+    keys = hits[:, 0].astype(np.int64) * width + hits[:, 1]
+    key = row * width + col
+    if backward:
+        position = np.searchsorted(keys, key, side='left') - 1
+    else:
+        position = np.searchsorted(keys, key, side='right')
+    return tuple(int(value) for value in hits[position % len(hits)])
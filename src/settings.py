@@ -0,0 +1,124 @@
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QVBoxLayout, QGridLayout, QGroupBox, QLabel, QSpinBox, \
+    QCheckBox, QPushButton, QMessageBox, QComboBox
+from cache import MB
+
+ACCURACY = {'low': "Low (less memory)", 'medium': "Medium", 'high': "High (more memory)"}
+
+
+class SettingsDialog(QDialog):
+    def __init__(self, settings: dict, cache=None):
+        super().__init__()
+        self.setMinimumSize(420, 200)
+        self.cache = cache
+        QBtn = QDialogButtonBox.Ok | QDialogButtonBox.Cancel
+        self.buttonBox = QDialogButtonBox(QBtn)
+        self.buttonBox.accepted.connect(self.accept)
+        self.buttonBox.rejected.connect(self.reject)
+
+        self.layout = QVBoxLayout()
+
+        # view and export
+        groupbox_view = QGroupBox("View and export:")
+        self.layout.addWidget(groupbox_view)
+        self.layout_view = QGridLayout()
+        groupbox_view.setLayout(self.layout_view)
+
+        self.layout_view.addWidget(QLabel("Round numbers to:"), 0, 0)
+        self.round_num = QSpinBox()
+        self.round_num.setRange(0, 10)
+        self.round_num.setValue(settings['round_numbers'])
+        self.layout_view.addWidget(self.round_num, 0, 1)
+
+        self.layout_view.addWidget(QLabel("SQLite export batch size (rows):"), 1, 0)
+        self.sqlite_batch_size = QSpinBox()
+        self.sqlite_batch_size.setRange(1000, 1000000)
+        self.sqlite_batch_size.setSingleStep(10000)
+        self.sqlite_batch_size.setValue(settings['sqlite_batch_size'])
+        self.layout_view.addWidget(self.sqlite_batch_size, 1, 1)
+
+        self.layout_view.addWidget(QLabel("Summary accuracy (quantiles, unique):"), 2, 0)
+        self.accuracy = QComboBox()
+        for key, label in ACCURACY.items():
+            self.accuracy.addItem(label, key)
+        self.accuracy.setCurrentIndex(max(0, self.accuracy.findData(settings['summary_accuracy'])))
+        self.layout_view.addWidget(self.accuracy, 2, 1)
+
+        self.layout_view.addWidget(QLabel("Undo history memory limit (MB):"), 3, 0)
+        self.history_size = QSpinBox()
+        self.history_size.setRange(0, 100000)
+        self.history_size.setSingleStep(16)
+        self.history_size.setValue(settings['history_size_mb'])
+        self.layout_view.addWidget(self.history_size, 3, 1)
+
+        # parse cache
+        groupbox_cache = QGroupBox("Cache of parsed CSV files:")
+        self.layout.addWidget(groupbox_cache)
+        self.layout_cache = QGridLayout()
+        groupbox_cache.setLayout(self.layout_cache)
+
+        self.chk_cache = QCheckBox("Keep parsed files in cache (faster reopening)")
+        self.chk_cache.setChecked(settings['parse_cache'])
+        self.chk_cache.setEnabled(cache is not None)
+        self.layout_cache.addWidget(self.chk_cache, 0, 0, 1, 2)
+
+        self.layout_cache.addWidget(QLabel("Cache size limit (MB):"), 1, 0)
+        self.cache_size = QSpinBox()
+        self.cache_size.setRange(10, 1000000)
+        self.cache_size.setSingleStep(100)
+        self.cache_size.setValue(settings['cache_size_mb'])
+        self.layout_cache.addWidget(self.cache_size, 1, 1)
+
+        self.label_cache = QLabel()
+        self.layout_cache.addWidget(self.label_cache, 2, 0)
+        self.btn_clear = QPushButton("Clear cache")
+        self.btn_clear.clicked.connect(self.onBtnClearClicked)
+        self.btn_clear.setEnabled(cache is not None)
+        self.layout_cache.addWidget(self.btn_clear, 2, 1)
+        self.showCacheSize()
+
+        # http cache of api downloads
+        groupbox_http = QGroupBox("Cache of API downloads:")
+        self.layout.addWidget(groupbox_http)
+        self.layout_http = QGridLayout()
+        groupbox_http.setLayout(self.layout_http)
+
+        self.layout_http.addWidget(QLabel("Use without asking server for (minutes):"), 0, 0)
+        self.http_cache_ttl = QSpinBox()
+        self.http_cache_ttl.setRange(0, 100000)
+        self.http_cache_ttl.setValue(settings['http_cache_ttl'])
+        self.layout_http.addWidget(self.http_cache_ttl, 0, 1)
+
+        self.layout_http.addWidget(QLabel("Cache size limit (MB):"), 1, 0)
+        self.http_cache_size = QSpinBox()
+        self.http_cache_size.setRange(0, 100000)
+        self.http_cache_size.setSingleStep(10)
+        self.http_cache_size.setValue(settings['http_cache_size_mb'])
+        self.layout_http.addWidget(self.http_cache_size, 1, 1)
+
+        self.layout.addWidget(self.buttonBox)
+        self.setLayout(self.layout)
+
+    def values(self) -> dict:
+        """ settings from dialog """
+        return {
+            'round_numbers': self.round_num.value(),
+            'sqlite_batch_size': self.sqlite_batch_size.value(),
+            'summary_accuracy': self.accuracy.currentData(),
+            'parse_cache': self.chk_cache.isChecked(),
+            'cache_size_mb': self.cache_size.value(),
+            'http_cache_ttl': self.http_cache_ttl.value(),
+            'http_cache_size_mb': self.http_cache_size.value(),
+            'history_size_mb': self.history_size.value(),
+        }
+
+    def showCacheSize(self):
+        if self.cache is not None:
+            self.label_cache.setText(f"Used: {self.cache.size() / MB:.1f} MB")
+        else:
+            self.label_cache.setText("Not available (pyarrow is not installed)")
+
+    def onBtnClearClicked(self):
+        button = QMessageBox.question(self, "Clear cache", "Remove all parsed files from cache?")
+        if button == QMessageBox.Yes:
+            self.cache.clear()
+            self.showCacheSize()
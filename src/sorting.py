@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from filtering import MaskCache
+
+
+def sort_codes(column, ascending=True):
+    """ column as integer codes with the same order as values (descending reversed), missing values
+        get the largest code, so they are last in both directions """
+    try:
+        codes, uniques = pd.factorize(column, sort=True)
+    except TypeError:
+        # values of mixed types (e.g. numbers and text) are compared as text
+        codes, uniques = pd.factorize(column.astype(str).where(column.notna()), sort=True)
+    n = len(uniques)
+    if not ascending:
+        codes = np.where(codes >= 0, n - 1 - codes, codes)
+    return np.where(codes < 0, n, codes)
+
+
+def sort_order(df, keys, progress=None, cancelled=None):
+    """ positions of rows of data frame sorted by keys - list of (column position, ascending), the first
+        key is the most important; stable sort (equal rows keep their order), missing values last """
+    from loader import CancelledError
+
+    codes = []
+    for number, (col, ascending) in enumerate(keys):
+        if cancelled is not None and cancelled():
+            raise CancelledError()
+        codes.append(sort_codes(df.iloc[:, col], ascending))
+        if progress is not None:
+            progress(int(100 * (number + 1) / (len(keys) + 1)))
+    if len(codes) == 1:
+        order = np.argsort(codes[0], kind='stable')
+    else:
+        # lexsort - the last key is the primary one
+        order = np.lexsort(codes[::-1])
+    if progress is not None:
+        progress(100)
+    return order
+
+
+class OrderCache(MaskCache):
+    """ permutations of recently used sort keys of current data (tuple of keys: positions of rows),
+        every permutation takes 8 bytes per row, so only a few are kept """
+
+    def __init__(self, max_items=4):
+        super().__init__(max_items)
+
+
+def next_sort_keys(keys, col: int, extend=False) -> list:
+    """ sort keys after click on column header: the same column - ascending, descending, not sorted,
+        other column - sort by it only (extend - as next key, e.g. shift + click) """
+    if not extend:
+        if keys == [(col, True)]:
+            return [(col, False)]
+        if keys == [(col, False)]:
+            return []
+        return [(col, True)]
+    keys = list(keys)
+    for i, (key_col, ascending) in enumerate(keys):
+        if key_col == col:
+            if ascending:
+                keys[i] = (col, False)
+            else:
+                del keys[i]
+            return keys
+    return keys + [(col, True)]
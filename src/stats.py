@@ -0,0 +1,290 @@
+import numpy as np
+import pandas as pd
+
+QUANTILES = (0.25, 0.5, 0.75)
+STATISTICS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max', 'unique']
+# accuracy of sketches: KLL k (rank error ~1.7/k), HyperLogLog precision p (relative error ~1.04/sqrt(2**p))
+ACCURACY = {'low': (100, 10), 'medium': (200, 12), 'high': (800, 14)}
+
+
+class KllSketch:
+    """ streaming quantile sketch (KLL): items are kept in levels, items on level h have weight 2**h,
+        full level is sorted and every second item moves to the next level; memory is O(k),
+        rank error about 1.7 / k """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values) -> None:
+        """ add array of values (without NaN) """
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # odd item stays on its level
+                keep = items[:len(items) % 2]
+                pairs = items[len(items) % 2:]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    @property
+    def exact(self) -> bool:
+        """ no item was dropped yet, quantiles are exact """
+        return len(self.levels) == 1
+
+    def quantiles(self, q) -> np.ndarray:
+        """ values at ranks q (0-1), linear interpolation as in pandas while sketch is exact """
+        q = np.asarray(q, dtype=float)
+        if self.n == 0:
+            return np.full(q.shape, np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return items[np.minimum(positions, len(items) - 1)]
+
+
+def _bit_length(x):
+    """ number of significant bits of every uint64 value (from float exponent, rounding of values
+        close below power of 2 above 2**53 can add one bit, which does not matter for the sketch) """
+    return np.frexp(x.astype(np.float64))[1]
+
+
+class HyperLogLog:
+    """ distinct count sketch: 2**p registers with maximum rank (leading zeros + 1) of hashed values,
+        memory 2**p bytes, relative error about 1.04 / sqrt(2**p); groups - number of independent
+        sketches (e.g. columns) updated together """
+
+    def __init__(self, p=12, groups=1):
+        self.p = p
+        self.registers = np.zeros((groups, 1 << p), dtype=np.uint8)
+
+    def update(self, values, group=None) -> None:
+        """ add array of values (numbers or strings, without missing values), group - array
+            with number of sketch for every value (default: first sketch) """
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values))
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        if group is not None:
+            index += np.asarray(group, dtype=np.int64) << self.p
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers.reshape(-1), index, rank.astype(np.uint8))
+
+    def counts(self) -> np.ndarray:
+        """ distinct count estimate of every group """
+        m = self.registers.shape[1]
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int64)).sum(axis=1)
+        zeros = np.count_nonzero(self.registers == 0, axis=1)
+        # small cardinality - linear counting
+        small = (estimate <= 2.5 * m) & (zeros > 0)
+        estimate[small] = m * np.log(m / zeros[small])
+        return np.round(estimate)
+
+    def count(self) -> float:
+        return float(self.counts()[0])
+
+
+class ColumnStats:
+    """ count, mean, std (Welford / Chan merge of chunks), min, max, quantile sketch and distinct count
+        sketch of one column """
+
+    def __init__(self, accuracy='medium'):
+        k, p = ACCURACY[accuracy]
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.sketch = KllSketch(k)
+        self.distinct = HyperLogLog(p)
+        # values which are not numbers (text in numeric column), not counted in statistics
+        self.coerced = 0
+
+    def update(self, values) -> None:
+        """ add chunk of values (float array, NaN - missing) """
+        values = values[~np.isnan(values)]
+        n = len(values)
+        if n == 0:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self.sketch.update(values)
+        self.distinct.update(values)
+
+    def result(self, unique=None):
+        """ statistics as Series (index as in DataFrame.describe and unique), names of approximate
+            statistics (from sketches) are in attrs['approximate'], number of values which are not
+            numbers in attrs['coerced']; unique - exact distinct count (sketch estimate when None) """
+        mean = self.mean if self.count > 0 else np.nan
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        quantiles = self.sketch.quantiles(QUANTILES)
+        distinct = self.distinct.count() if unique is None else unique
+        values = [self.count, mean, std, self.min] + list(quantiles) + [self.max, distinct]
+        result = pd.Series(values, index=STATISTICS, dtype=float)
+        approximate = [] if self.sketch.exact else ['25%', '50%', '75%']
+        result.attrs['approximate'] = approximate + ['unique'] if unique is None else approximate
+        result.attrs['coerced'] = self.coerced
+        return result
+
+
+def numeric_columns(df) -> list:
+    """ positions of numeric (not bool) columns """
+    return [i for i, dtype in enumerate(df.dtypes)
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+
+
+def column_values(column):
+    """ column as float array, missing values as NaN (text in numeric column of a chunk as well) """
+    if not pd.api.types.is_numeric_dtype(column.dtype) or pd.api.types.is_bool_dtype(column.dtype):
+        column = pd.to_numeric(column, errors='coerce')
+    return column.to_numpy(dtype='float64', na_value=np.nan)
+
+
+def coerced_count(column, values) -> int:
+    """ number of values of column missing after conversion to float array (text, not numbers) """
+    if pd.api.types.is_numeric_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype):
+        return 0
+    return int(column.notna().sum()) - int(np.count_nonzero(~np.isnan(values)))
+
+
+def summarize_frame(df, columns=None, accuracy='medium', chunksize=1000000, progress=None, cancelled=None,
+                    column_done=None) -> dict:
+    """ statistics of numeric columns (positions) of data frame, every column in one chunked pass,
+        column_done((position, Series)) is called when column is finished; returns dict position: Series """
+    from loader import CancelledError
+
+    if columns is None:
+        columns = numeric_columns(df)
+    result = {}
+    for number, col in enumerate(columns):
+        values = column_values(df.iloc[:, col])
+        stats = ColumnStats(accuracy)
+        for start in range(0, len(values), chunksize):
+            if cancelled is not None and cancelled():
+                raise CancelledError()
+            stats.update(values[start:start + chunksize])
+        # data in memory - exact distinct count
+        result[col] = stats.result(unique=pd.unique(values[~np.isnan(values)]).size)
+        if column_done is not None:
+            column_done((col, result[col]))
+        if progress is not None:
+            progress(int(100 * (number + 1) / len(columns)))
+    return result
+
+
+def summarize_chunks(chunks, columns, total=None, accuracy='medium', progress=None, cancelled=None,
+                     column_done=None) -> dict:
+    """ statistics of columns (positions) in one pass over chunks of data (file larger than memory),
+        memory is bounded by chunk and sketch size; total - number of rows for progress """
+    from loader import CancelledError
+
+    stats = {col: ColumnStats(accuracy) for col in columns}
+    rows = 0
+    for chunk in chunks:
+        if cancelled is not None and cancelled():
+            raise CancelledError()
+        for col in columns:
+            # numeric columns are detected from the first rows, text in later chunks is flagged
+            column = chunk.iloc[:, col]
+            values = column_values(column)
+            stats[col].update(values)
+            stats[col].coerced += coerced_count(column, values)
+        rows += chunk.shape[0]
+        if progress is not None and total:
+            progress(min(100, int(100 * rows / total)))
+    result = {col: item.result() for col, item in stats.items()}
+    if column_done is not None:
+        for item in result.items():
+            column_done(item)
+    return result
+
+
+def summarize(data, columns=None, total=None, accuracy='medium', progress=None, cancelled=None, column_done=None):
+    """ statistics of data frame (column by column) or of chunks of data (one pass) """
+    if isinstance(data, pd.DataFrame):
+        return summarize_frame(data, columns, accuracy, progress=progress, cancelled=cancelled,
+                               column_done=column_done)
+    return summarize_chunks(data, columns, total, accuracy, progress=progress, cancelled=cancelled,
+                            column_done=column_done)
+
+
+class StatsCache:
+    """ statistics of columns of current data (position: Series) """
+
+    def __init__(self):
+        self._stats = {}
+
+    def get(self, col: int):
+        return self._stats.get(col)
+
+    def put(self, col: int, stats) -> None:
+        self._stats[col] = stats
+
+    def missing(self, columns: list) -> list:
+        """ columns without statistics """
+        return [col for col in columns if col not in self._stats]
+
+    def copy(self):
+        """ new cache with the same statistics (results of running workers go to the old one) """
+        cache = StatsCache()
+        cache._stats = dict(self._stats)
+        return cache
+
+    def frame(self, columns: list, names: list):
+        """ statistics of columns as data frame (like DataFrame.describe), NaN for missing columns,
+            attrs['approximate'] - set of (statistic, column position) with approximate values,
+            attrs['coerced'] - column position: number of values which are not numbers """
+        data = np.full((len(STATISTICS), len(columns)), np.nan)
+        approximate = set()
+        coerced = {}
+        for i, col in enumerate(columns):
+            if col in self._stats:
+                data[:, i] = self._stats[col].to_numpy()
+                approximate.update((name, col) for name in self._stats[col].attrs.get('approximate', []))
+                if self._stats[col].attrs.get('coerced'):
+                    coerced[col] = self._stats[col].attrs['coerced']
+        df = pd.DataFrame(data, index=STATISTICS, columns=names)
+        df.attrs['approximate'] = approximate
+        df.attrs['coerced'] = coerced
+        return df
+
+    def invalidate(self, columns=None) -> None:
+        """ remove statistics of columns (all when columns is None) """
+        if columns is None:
+            self._stats.clear()
+        else:
+            for col in columns:
+                self._stats.pop(col, None)
@@ -1,23 +1,66 @@
 import numpy as np
 from PyQt5 import QtCore
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QVBoxLayout, QTableView
+from PyQt5.QtWidgets import QDialog, QDialogButtonBox, QVBoxLayout, QTableView, QLabel
 
 
 class SummaryModel(QtCore.QAbstractTableModel):
-    def __init__(self, data):
+    def __init__(self, data, columns=None, pending=()):
+        """ columns - positions of summary columns in data frame, pending - positions of columns
+            not computed yet (filled in by setColumn), approximate values (statistic, position)
+            are in data.attrs['approximate'], numbers of ignored text values (position: count)
+            in data.attrs['coerced'] """
         super().__init__()
         self._data = data
+        self._positions = list(columns or [])
+        self._columns = {col: i for i, col in enumerate(self._positions)}
+        self._pending = set(pending)
+        self._approximate = set(data.attrs.get('approximate', set()))
+        self._coerced = dict(data.attrs.get('coerced', {}))
+
+    def setColumn(self, item) -> None:
+        """ statistics of column computed, item: (position, Series) """
+        col, values = item
+        if col not in self._columns:
+            return
+        i = self._columns[col]
+        self._data.iloc[:, i] = values.to_numpy()
+        self._approximate.update((name, col) for name in values.attrs.get('approximate', []))
+        if values.attrs.get('coerced'):
+            self._coerced[col] = values.attrs['coerced']
+            self.headerDataChanged.emit(Qt.Horizontal, i, i)
+        self._pending.discard(col)
+        self.dataChanged.emit(self.index(0, i), self.index(self._data.shape[0] - 1, i))
+
+    def isPending(self, section: int) -> bool:
+        return any(self._columns[col] == section for col in self._pending)
+
+    def coerced(self, section: int) -> int:
+        """ number of text values ignored in column (not numbers) """
+        return self._coerced.get(self._positions[section], 0) if section < len(self._positions) else 0
+
+    def isApproximate(self, index) -> bool:
+        if index.column() >= len(self._positions):
+            return False
+        return (self._data.index[index.row()], self._positions[index.column()]) in self._approximate
 
     def data(self, index, role):
+        if role == Qt.DisplayRole and self.isPending(index.column()):
+            return "..."
         value = self._data.iloc[index.row(), index.column()]
         is_numeric = np.isreal(value) and not isinstance(value, bool)
 
         if role == Qt.DisplayRole:
             if is_numeric:
-                return f"{value:.3f}"  # temporary all numbers as float
+                text = f"{value:.3f}"  # temporary all numbers as float
             else:
-                return str(value)
+                text = str(value)
+            if self.isApproximate(index):
+                text = "≈ " + text
+            return text
+
+        if role == Qt.ToolTipRole and self.isApproximate(index):
+            return "Approximate value (streaming sketch)"
 
         if role == Qt.TextAlignmentRole:
             if is_numeric:
@@ -37,14 +80,18 @@ class SummaryModel(QtCore.QAbstractTableModel):
         # header data (first row and first column)
         if role == Qt.DisplayRole:
             if orientation == Qt.Horizontal:
-                return str(self._data.columns[section])
+                name = str(self._data.columns[section])
+                return name + " (!)" if self.coerced(section) else name
 
             if orientation == Qt.Vertical:
                 return str(self._data.index[section])
 
+        if role == Qt.ToolTipRole and orientation == Qt.Horizontal and self.coerced(section):
+            return f"{self.coerced(section)} values are not numbers, they are not included in statistics"
+
 
 class SummaryDialog(QDialog):
-    def __init__(self, summary_data):
+    def __init__(self, summary_data, columns=None, pending=()):
         super().__init__()
         self.setMinimumSize(600, 350)
         QBtn = QDialogButtonBox.Ok
@@ -52,8 +99,11 @@ class SummaryDialog(QDialog):
         self.buttonBox.accepted.connect(self.accept)
         self.layout = QVBoxLayout()
         self.table = QTableView()
-        self.model = SummaryModel(summary_data)
+        self.model = SummaryModel(summary_data, columns, pending)
         self.table.setModel(self.model)
         self.layout.addWidget(self.table)
+        self.layout.addWidget(QLabel("≈ approximate value (quantile and distinct count sketches), "
+                                     "accuracy can be changed in settings\n"
+                                     "(!) column with values which are not numbers, they are not included"))
         self.layout.addWidget(self.buttonBox)
         self.setLayout(self.layout)
@@ -1,6 +1,24 @@
+import io
+import os
+import sqlite3
 import pytest
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import Qt
 import mainwindow
 import dataload
+import export
+import loader
+import rowindex
+import sorting
+import filtering
+import search
+import nanparam
+import history
+import cache
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
 
 
 @pytest.fixture
@@ -16,8 +34,550 @@ def test_title(app):
     assert app.windowTitle() == "CSV Viewer"
 
 
-def test_download():
-    link = 'http://climatedataapi.worldbank.org/climateweb/rest/v1/country/cru/tas/year/POL.csv'
-    result, text = dataload.import_data_by_api(link)
-    assert result
+@pytest.fixture
+def http_server():
+    """ local stand-in for the API: /data.csv (first request fails with 503, ETag), /missing.csv - 404 """
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    body = b"year,data\n" + b"".join(f"{year},{year % 10}.5\n".encode() for year in range(1901, 2013))
+    requests_done = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_done.append(self.path)
+            if self.path == '/data.csv' and self.headers.get('If-None-Match') == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+            elif self.path == '/data.csv' and len(requests_done) > 1:
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', '"v1"')
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_response(503 if self.path == '/data.csv' else 404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", body, requests_done
+    server.shutdown()
+    server.server_close()
+
+
+def test_download(http_server, tmp_path):
+    address, body, requests_done = http_server
+    file_name = str(tmp_path / 'data.csv')
+    progress = []
+    assert dataload.download(address + '/data.csv', file_name, backoff=0.01, progress=progress.append) == file_name
+    with open(file_name, 'rb') as f:
+        assert f.read() == body
+    assert len(requests_done) == 2 and progress[-1] == 100
+
+    with pytest.raises(dataload.DownloadError):
+        dataload.download(address + '/missing.csv', str(tmp_path / 'missing.csv'), backoff=0.01)
+    assert not os.path.exists(str(tmp_path / 'missing.csv'))
+    assert not os.path.exists(str(tmp_path / 'missing.csv.part'))
+
+
+def test_read_csv_stream(http_server, tmp_path):
+    address, body, requests_done = http_server
+    file_name = str(tmp_path / 'data.csv')
+    chunks = []
+    df = dataload.read_csv_stream(address + '/data.csv', file_name, chunk_rows=50, backoff=0.01,
+                                  frame_ready=chunks.append)
+    assert [chunk.shape[0] for chunk in chunks] == [50, 50, 12]
+    pd.testing.assert_frame_equal(df, pd.read_csv(io.BytesIO(body)))
+    with open(file_name, 'rb') as f:
+        assert f.read() == body
+
+    with pytest.raises(dataload.DownloadError):
+        dataload.read_csv_stream(address + '/missing.csv', str(tmp_path / 'missing.csv'), backoff=0.01)
+    assert not os.path.exists(str(tmp_path / 'missing.csv.part'))
+
+
+def test_read_csv_stream_cache(http_server, tmp_path):
+    import httpcache
+    address, body, requests_done = http_server
+    cache = httpcache.HttpCache(folder=str(tmp_path / 'cache'), ttl=0)
+    messages = []
+    progress = []
+    expected = pd.read_csv(io.BytesIO(body))
+    for _ in range(2):
+        df = dataload.read_csv_stream(address + '/data.csv', chunk_rows=50, backoff=0.01, cache=cache,
+                                      progress=progress.append, message=messages.append)
+        pd.testing.assert_frame_equal(df, expected)
+    assert messages[0].startswith("HTTP cache miss") and messages[1].startswith("HTTP cache hit (not modified)")
+
+    cache.ttl = 3600
+    count = len(requests_done)
+    file_name = str(tmp_path / 'data.csv')
+    df = dataload.read_csv_stream(address + '/data.csv', file_name, chunk_rows=50, cache=cache,
+                                  progress=progress.append, message=messages.append)
+    pd.testing.assert_frame_equal(df, expected)
+    assert progress and max(progress) == 100
+    assert messages[2].startswith("HTTP cache hit:") and len(requests_done) == count
+    with open(file_name, 'rb') as f:
+        assert f.read() == body
+
+
+def test_load_api_stream(app, qtbot, http_server, tmp_path, monkeypatch):
+    import httpcache
+    address, body, requests_done = http_server
+    monkeypatch.setattr(app, 'http_cache', lambda: httpcache.HttpCache(folder=str(tmp_path / 'cache')))
+    app.load_api_stream(address + '/data.csv')
+    qtbot.waitUntil(lambda: app.load_worker is None and app.df is not None, timeout=10000)
+    assert app.df.shape == (112, 2)
+    assert app.model.rowCount(None) == 112
+    assert app.labelStatus.text() == "Rows: 112 Cols: 2"
+
+
+def test_import_links_error(app, qtbot, monkeypatch):
+    monkeypatch.setattr(mainwindow.QMessageBox, 'warning', lambda *args: None)
+    worker = mainwindow.Worker(lambda **kwargs: None)
+    app.load_worker = worker
+    app.onLinksImportError(worker, "failed")
+    assert app.load_worker is None
+    app.load_worker = worker
+    app.onLinksImportCancelled(worker)
+    assert app.load_worker is None
+
+
+def test_close_while_loading(app, qtbot):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    worker = app.load_worker
+    app.onToolbarCloseButtonClick()
+    assert worker.is_cancelled() and app.load_worker is None
+    qtbot.wait(500)
+    assert app.df is None and app.model is None
+
+
+def test_close_while_streaming(app, qtbot):
+    worker = mainwindow.Worker(lambda **kwargs: None)
+    chunk = pd.DataFrame({'a': [1.0, 2.0]})
+    app.load_worker = worker
+    app.onApiRows(worker, 'api', chunk)
+    assert app.stream_worker is worker
+    app.onToolbarCloseButtonClick()
+    assert worker.is_cancelled() and app.load_worker is None and app.stream_worker is None
+    # rows still emitted by cancelled worker are ignored
+    app.onApiRows(worker, 'api', chunk)
+    app.onApiLoaded(worker, 'api', chunk)
+    assert app.model is None
+
+    worker = mainwindow.Worker(lambda **kwargs: None)
+    app.load_worker = worker
+    app.onApiRows(worker, 'api', chunk)
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    assert worker.is_cancelled() and app.stream_worker is None
+    qtbot.waitUntil(lambda: app.load_worker is None, timeout=10000)
+    assert app.df.shape == (5000, 10)
+
+
+def test_table_model_format():
+    df = pd.DataFrame({'a': [1.5, np.nan, 3], 'b': ['x', None, 'z']})
+    model = mainwindow.TableModel(df, 2)
+    assert model.data(model.index(0, 0), Qt.DisplayRole) == "1.50"
+    assert model.data(model.index(2, 1), Qt.DisplayRole) == "z"
+    assert model.data(model.index(1, 0), Qt.ForegroundRole) is not None
+    model.setRoundNum(0)
+    assert model.data(model.index(2, 0), Qt.DisplayRole) == "3"
+
+
+def test_table_model_append_chunk():
+    df = pd.DataFrame({'a': [1.5, np.nan], 'b': ['x', None]})
+    model = mainwindow.TableModel(df, 2)
+    model.appendChunk(pd.DataFrame({'a': [np.nan, 4.0], 'b': ['y', 'z']}, index=[2, 3]))
+    assert model.rowCount(None) == 4
+    assert model.data(model.index(3, 0), Qt.DisplayRole) == "4.00"
+    assert model.data(model.index(2, 0), Qt.ForegroundRole) is not None
+    assert model.headerData(3, Qt.Vertical, Qt.DisplayRole) == "4"
+    assert model.streamedFrame().shape == (4, 2)
+
+
+def test_open_csv_file(app, qtbot):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    assert app.df.shape == (5000, 10)
+    assert app.labelStatus.text() == "Rows: 5000 Cols: 10"
+
+
+def test_sort_order():
+    df = pd.DataFrame({'a': [3, 1, np.nan, 1, 2], 'b': ['x', 'z', None, 'y', 'y']})
+    assert sorting.sort_order(df, [(0, True)]).tolist() == [1, 3, 4, 0, 2]
+    assert sorting.sort_order(df, [(0, False)]).tolist() == [0, 4, 1, 3, 2]
+    assert sorting.sort_order(df, [(1, True), (0, False)]).tolist() == [0, 4, 3, 1, 2]
+    assert sorting.next_sort_keys([(0, True)], 0) == [(0, False)]
+    assert sorting.next_sort_keys([(0, False)], 0) == []
+    assert sorting.next_sort_keys([(0, True)], 1, extend=True) == [(0, True), (1, True)]
+    orders = sorting.OrderCache(max_items=2)
+    for col in range(3):
+        orders.put(((col, True),), sorting.sort_order(df, [(col % 2, True)]))
+    assert orders.get(((0, True),)) is None and orders.get(((2, True),)) is not None
+
+
+def test_sort_table(app, qtbot):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    app.onHeaderClicked(1)
+    qtbot.waitUntil(lambda: app.model.rowCount(None) == 5000 and app.model._rows is not None, timeout=10000)
+    values = [float(app.model.data(app.model.index(row, 1), Qt.DisplayRole)) for row in range(100)]
+    assert values == sorted(values)
+    assert app.model.data(app.model.index(0, 1), Qt.DisplayRole) == "%.2f" % app.df.iloc[:, 1].min()
+    app.onHeaderClicked(1)
+    app.onHeaderClicked(1)
+    assert app.model._rows is None and app.sort_keys == []
+
+
+def test_filter_mask():
+    df = pd.DataFrame({'col_3': [10, 60, 70, 80], 'col_7': [np.nan, 1, np.nan, 2]})
+    mask = filtering.filter_mask(df, 'col_3 > 50 and col_7.isna()')
+    assert mask.tolist() == [False, False, True, False]
+    assert filtering.view_rows(mask, np.array([3, 2, 1, 0])).tolist() == [2]
+    with pytest.raises(ValueError):
+        filtering.filter_mask(df, 'col_3 + 1')
+    cache = filtering.MaskCache(max_items=1)
+    cache.put('a', mask)
+    cache.put('b', mask)
+    assert cache.get('a') is None and cache.get('b') is mask
+
+
+def test_filter_table(app, qtbot):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    expected = int(((app.df['col_3'] > 50) & app.df['col_7'].isna()).sum())
+    app.filter_edit.setEditText('col_3 > 50 and col_7.isna()')
+    app.onFilter()
+    qtbot.waitUntil(lambda: app.filter_mask is not None, timeout=10000)
+    assert app.model.rowCount(None) == expected
+    assert app.labelStatus.text() == f"Rows: {expected} of 5000 Cols: 10"
+    app.onFilterClear()
+    assert app.model.rowCount(None) == 5000
+    # recent filter - mask from cache
+    app.filter_edit.setEditText('col_3 > 50 and col_7.isna()')
+    app.onFilter()
+    assert app.model.rowCount(None) == expected
+
+
+def test_search_index():
+    df = pd.DataFrame({'a': [1.5, np.nan, 31.0], 'b': ['Xy', 'zz', 'ÄB']})
+    index = search.build_index(df, 2)
+    assert np.argwhere(index.find('31.0')).tolist() == [[2, 0]]
+    assert np.argwhere(index.find('äb')).tolist() == [[2, 1]]
+    assert np.argwhere(index.find('nan')).tolist() == [[1, 0]]
+    hits = search.view_hits(index.find('.5'), np.array([2, 1, 0]))
+    assert hits.tolist() == [[2, 0]]
+    hits = np.array([[0, 1], [2, 0], [2, 1]])
+    assert search.next_hit(hits, 2, 0) == (2, 1)
+    assert search.next_hit(hits, 2, 1) == (0, 1)
+    assert search.next_hit(hits, 0, 1, backward=True) == (2, 1)
+
+
+def test_find_table(app, qtbot):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    app.find_edit.setText('100.00')
+    app.onFind('next')
+    qtbot.waitUntil(lambda: app.search_hits is not None, timeout=10000)
+    expected = int((app.df == 100).sum().sum())
+    assert app.search_hits.sum() == expected
+    current = app.table.currentIndex()
+    assert app.model.data(current, Qt.DisplayRole) == "100.00"
+    assert app.model.data(current, mainwindow.SearchHitRole)
+    assert app.model.data(current, Qt.BackgroundRole) is not None
+
+
+def test_open_csv_file_lazy(app, qtbot, tmp_path, monkeypatch):
+    # sidecar row index is not written to user's config folder
+    monkeypatch.setattr(rowindex, 'INDEX_FOLDER', str(tmp_path))
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False, lazy=True)
+    qtbot.waitUntil(lambda: app.source is not None, timeout=10000)
+    assert app.source.shape == (5000, 10)
+    assert app.model.data(app.model.index(0, 1), Qt.DisplayRole) == "31.00"
+    assert app.model.headerData(4999, Qt.Vertical, Qt.DisplayRole) == "5000"
+
+
+def test_row_index_append(tmp_path):
+    file_name = str(tmp_path / 'data.csv')
+    with open(file_name, 'w') as f:
+        f.write('a,b\n1,"x\ny"\n2,')
+    offsets = rowindex.load_row_offsets(file_name, folder=str(tmp_path))
+    assert list(offsets) == [0, 4, 12]
+    with open(file_name, 'a') as f:
+        f.write('z\n3,w\n')
+    offsets = rowindex.load_row_offsets(file_name, folder=str(tmp_path))
+    assert list(offsets) == list(rowindex.scan_row_offsets(file_name)[0]) == [0, 4, 12, 16]
+
+
+def test_export_markdown(tmp_path):
+    file_name = str(tmp_path / 'data.md')
+    df = pd.DataFrame({'a': [1.5, np.nan], 'b': ['x', 'y']})
+    export.export_markdown(file_name, [df.iloc[:1], df.iloc[1:]], total=2)
+    with open(file_name) as f:
+        lines = f.read().splitlines()
+    assert lines[2:] == [" |  | a | b | ", "|---:|---:|---|", " | 0 | 1.5 | x | ", " | 1 | nan | y | "]
+
+
+def test_export_xlsx(tmp_path):
+    import zipfile
+    file_name = str(tmp_path / 'data.xlsx')
+    # index column with gaps, infinite value
+    df = pd.DataFrame({'a': [1.5, np.inf, np.nan]}, index=pd.Index([1.0, np.nan, 3.0], name='id'))
+    messages = []
+    export.run_export('xlsx', file_name, [df], total=3, message=messages.append)
+    with zipfile.ZipFile(file_name) as f:
+        sheet = f.read('xl/worksheets/sheet1.xml').decode('utf-8')
+    assert '#DIV/0!' in sheet and '<v>1.5</v>' in sheet and 'r="A3"' not in sheet
+    assert messages[-1].startswith("Exported rows: 3 ")
+
+
+def test_export_cancel_removes_file(tmp_path):
+    file_name = str(tmp_path / 'data.csv')
+    df = pd.DataFrame({'a': range(10)})
+    with pytest.raises(loader.CancelledError):
+        export.run_export('csv', file_name, loader.frame_chunks(df, 5), cancelled=lambda: True)
+    assert not os.path.exists(file_name)
+    messages = []
+    export.run_export('csv', file_name, loader.frame_chunks(df, 5), total=10, message=messages.append)
+    assert messages[-1].startswith("Exported rows: 10 ")
+    assert pd.read_csv(file_name, index_col=0).shape == (10, 1)
+
+
+def test_export_sqlite(tmp_path):
+    file_name = str(tmp_path / 'data.sqlite')
+    df = pd.DataFrame({'a': [1.5, np.nan, 3.0], 'b': ['x', None, 'z']})
+    export.run_export('sqlite', file_name, loader.frame_chunks(df, 2), batch_size=1)
+    with pytest.raises(ValueError):
+        export.run_export('sqlite', file_name, [df])
+    export.run_export('sqlite', file_name, [df], if_exists='append')
+    con = sqlite3.connect(file_name)
+    assert con.execute("SELECT count(*), sum(a IS NULL), sum(b IS NULL) FROM csv_data").fetchone() == (6, 2, 2)
+    con.close()
+
+    # journal mode of user's database is kept
+    file_name = str(tmp_path / 'wal.sqlite')
+    con = sqlite3.connect(file_name)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.close()
+    export.run_export('sqlite', file_name, [df])
+    con = sqlite3.connect(file_name)
+    assert con.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    con.close()
+
+
+@pytest.mark.skipif(not cache.cache_available(), reason="pyarrow is not installed")
+def test_parse_cache(tmp_path):
+    file_name = os.path.join(DATA_DIR, 'small_data.csv')
+    parse_cache = cache.ParseCache(folder=str(tmp_path), min_file_size=0)
+    df = loader.load_csv(file_name, index=True, cache=parse_cache)
+    parse_cache.put(file_name, df, sep=',', decimal='.', header=True, index=True)
+    cached = parse_cache.get(file_name, sep=',', decimal='.', header=True, index=True)
+    assert cached.equals(df) and cached.index.name == 'col_1'
+    assert parse_cache.get(file_name, sep=';', decimal='.', header=True, index=True) is None
+    parse_cache.max_size = 0
+    parse_cache.evict()
+    assert parse_cache.size() == 0
+
+
+def test_compact_load():
+    file_name = os.path.join(DATA_DIR, 'small_data.csv')
+    df = loader.read_csv_chunked(file_name, index=False, compact=True, chunksize=1000)
+    plain = loader.read_csv_chunked(file_name, index=False)
+    assert str(df.dtypes['col_1']) == 'Int8'
+    assert df.memory_usage(deep=True).sum() * 3 < df.attrs['memory_uncompacted']
+    assert (df.astype('float64').fillna(-1) == plain.fillna(-1)).all().all()
+    model = mainwindow.TableModel(df, 2)
+    assert model.data(model.index(0, 1), Qt.DisplayRole) == "31.00"
+
+
+@pytest.mark.parametrize('engine', list(loader.ENGINES))
+def test_read_csv_engines(engine):
+    if engine == 'pyarrow' and not loader.pyarrow_available():
+        pytest.skip("pyarrow is not installed")
+    file_name = os.path.join(DATA_DIR, 'small_data.csv')
+    df = loader.read_csv(file_name, index=False, engine=engine)
+    # no silent fallback to c engine
+    assert df.attrs['engine'] == engine
+    assert df.equals(pd.read_csv(file_name))
+
+
+def test_parallel_split_quoted(tmp_path):
+    import parallel
+    file_name = str(tmp_path / 'quoted.csv')
+    with open(file_name, 'w') as f:
+        f.write('id,text\n')
+        for i in range(2000):
+            f.write(f'{i},"line\n{i},next"\n')
+    offsets, _ = rowindex.scan_row_offsets(file_name)
+    ranges = parallel.split_ranges(file_name, 5)
+    assert len(ranges) == 5
+    assert all(start in offsets for start, _ in ranges)
+    df = parallel.read_csv_parallel(file_name, index=False, workers=3, min_part_size=1000)
+    assert df.equals(pd.read_csv(file_name))
+
+
+def test_convert_files(tmp_path):
+    import convert
+    pattern = os.path.join(DATA_DIR, 'small_*.csv')
+    files = convert.expand_inputs([pattern])
+    results = list(convert.convert_files(files, 'sqlite', str(tmp_path), workers=1, dropna=True))
+    file_name, output, rows, _, error = results[0]
+    assert error is None
+    expected = pd.read_csv(file_name).dropna()
+    assert rows == expected.shape[0]
+    con = sqlite3.connect(output)
+    assert con.execute("SELECT count(*) FROM csv_data").fetchone()[0] == rows
+    con.close()
+    # inputs with the same name from different folders do not overwrite each other
+    used = set()
+    names = [convert.output_name(os.path.join(folder, 'x.csv'), 'md', str(tmp_path), used) for folder in 'ab']
+    assert [os.path.basename(name) for name in names] == ['x.md', 'x_2.md']
+
+
+def test_startup_imports():
+    import subprocess
+    import sys
+    code = "import sys, mainwindow; print(sorted({'pandas', 'numpy', 'requests', 'PyQt5.QtSql'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_summary_stats(app, qtbot, monkeypatch):
+    import stats
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    expected = app.df.describe()
+    result = stats.summarize_frame(app.df, chunksize=1000)
+    for col in range(app.df.shape[1]):
+        for name in ('count', 'mean', 'std', 'min', 'max'):
+            assert result[col][name] == pytest.approx(expected.iloc[:, col][name])
+        assert result[col]['50%'] == pytest.approx(expected.iloc[:, col]['50%'], abs=5)
+        assert result[col]['unique'] == app.df.iloc[:, col].nunique()
+        assert '50%' in result[col].attrs['approximate'] and 'unique' not in result[col].attrs['approximate']
+        app.stats_cache.put(col, result[col])
+    streamed = stats.summarize_chunks(loader.frame_chunks(app.df, 700), [0, 1], total=app.df.shape[0])
+    assert streamed[1]['mean'] == pytest.approx(result[1]['mean'])
+    assert streamed[1]['unique'] == pytest.approx(result[1]['unique'], rel=0.05)
+    # text in later chunks of numeric column is flagged
+    mixed = stats.summarize_chunks([pd.DataFrame({'a': [1, 2]}), pd.DataFrame({'a': ['3', 'x', None]})], [0])
+    assert mixed[0]['count'] == 3 and mixed[0].attrs['coerced'] == 1
+
+    # column without missing values in removed rows keeps statistics
+    df = app.df.copy()
+    df.iloc[:, 0] = df.iloc[:, 0].where(df.iloc[:, 1:].notna().all(axis=1))
+    app.show_data(df, 'small_data.csv')
+    for col, values in stats.summarize_frame(df).items():
+        app.stats_cache.put(col, values)
+    monkeypatch.setattr(nanparam.NanDialog, 'exec_', lambda self: True)
+    app.onRemoveNaN()
+    assert app.stats_cache.missing(list(range(10))) == list(range(1, 10))
+
+
+def test_remove_nan(app, qtbot, monkeypatch):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    df = app.df
+    monkeypatch.setattr(nanparam.NanDialog, 'exec_', lambda self: True)
+    monkeypatch.setattr(nanparam.NanDialog, 'columns', lambda self: [0])
+    app.onRemoveNaN()
+    expected = int(df.iloc[:, 0].notna().sum())
+    # data frame is kept, rows are hidden in the same model
+    assert app.df is df and app.df.shape[0] == 5000
+    assert app.model.rowCount(None) == expected
+    assert app.labelStatus.text() == f"Rows: {expected} Cols: 10"
+    assert all(app.model.data(app.model.index(row, 0), Qt.DisplayRole) != "nan" for row in range(50))
+    assert sum(chunk.shape[0] for chunk in app.data_chunks(1000)) == expected
+    # info computed before rows were restored is not used
+    row_mask = app.row_mask
+    app.onRestoreRows()
+    assert app.model.rowCount(None) == 5000
+    app.onInfoReady(app.model, row_mask, ([], ''))
+    assert app.info_data is None
+
+
+def test_history():
+    masks = [np.ones(100, dtype=bool), np.zeros(100, dtype=bool)]
+    undo_history = history.History(max_bytes=150)
+    undo_history.push("a", (masks[0], 'stats'))
+    undo_history.push("b", (masks[1], 'stats'))
+    # the oldest state is dropped above memory limit
+    assert undo_history.size() == 100 and undo_history.undo_label() == "b"
+    label, state = undo_history.undo('current')
+    assert label == "b" and state[0] is masks[1]
+    assert not undo_history.can_undo() and undo_history.redo('again') == ("b", 'current')
+
+
+def test_undo_remove_nan(app, qtbot, monkeypatch):
+    app.open_csv_file(os.path.join(DATA_DIR, 'small_data.csv'), index=False)
+    qtbot.waitUntil(lambda: app.df is not None, timeout=10000)
+    monkeypatch.setattr(nanparam.NanDialog, 'exec_', lambda self: True)
+    app.onRemoveNaN()
+    removed = app.model.rowCount(None)
+    mask = app.row_mask
+    assert removed < 5000 and app.button_undo.isEnabled()
+    app.onUndo()
+    assert app.row_mask is None and app.model.rowCount(None) == 5000
+    app.onRedo()
+    assert app.row_mask is mask and app.model.rowCount(None) == removed
+
+
+def test_table_info():
+    import info
+    df = pd.DataFrame({'a': [1.0, np.nan, 3.0, 3.0], 'b': ['x', 'y', None, 'x']})
+    c_tab, memory = info.table_info(df)
+    assert [row[2] for row in c_tab] == [3, 3]
+    assert [row[3] for row in c_tab] == [2, 2]
+    assert (c_tab[0][4], c_tab[0][5]) == (1.0, 3.0)
+    assert memory.startswith("Memory usage:")
+    chunked, memory = info.table_info(loader.frame_chunks(df, 3), 4)
+    assert memory is None
+    assert [row[2:4] for row in chunked] == [row[2:4] for row in c_tab]
+    # nullable column with chunk without values (compact mode)
+    nullable = pd.DataFrame({'c': pd.array([pd.NA, pd.NA, 5, 2], dtype='Int8')})
+    c_tab, _ = info.table_info(loader.frame_chunks(nullable, 2), 4)
+    assert (c_tab[0][4], c_tab[0][5]) == (2, 5)
+    model = info.InfoModel([['c', np.dtype(object), 0, 0, pd.NA, np.nan, None]])
+    assert model.data(model.index(0, 4), Qt.DisplayRole) == ""
+
+
+def test_fetch_many(http_server, tmp_path):
+    address, body, requests_done = http_server
+    links = [address + '/data.csv', address + '/missing.csv']
+    results, df = dataload.fetch_many(links, backoff=0.01)
+    assert df.shape == (112, 3) and list(df['source'].unique()) == [links[0]]
+    assert results[0][4] is None and results[1][4] is not None
+
+    results, df = dataload.fetch_many(links[:1] * 2, folder=str(tmp_path))
+    assert df is None
+    assert [os.path.basename(result[1]) for result in results] == ['data.csv', 'data_2.csv']
+    assert "Imported 2 of 2 links." in dataload.import_report(results)
+
+
+def test_http_cache(http_server, tmp_path):
+    import httpcache
+    address, body, requests_done = http_server
+    cache = httpcache.HttpCache(folder=str(tmp_path / 'cache'), ttl=0)
+    messages = []
+    dataload.download(address + '/data.csv', str(tmp_path / 'a.csv'), backoff=0.01, cache=cache,
+                      message=messages.append)
+    dataload.download(address + '/data.csv', str(tmp_path / 'b.csv'), cache=cache, message=messages.append)
+    assert messages[0].startswith("HTTP cache miss") and messages[1].startswith("HTTP cache hit (not modified)")
+    with open(str(tmp_path / 'b.csv'), 'rb') as f:
+        assert f.read() == body
 
+    cache.ttl = 3600
+    count = len(requests_done)
+    dataload.download(address + '/data.csv', str(tmp_path / 'c.csv'), cache=cache, message=messages.append)
+    assert messages[2].startswith("HTTP cache hit:") and len(requests_done) == count
+    cache.max_size = 0
+    cache.evict()
+    assert cache.lookup(address + '/data.csv') is None
+    # files removed by other thread meanwhile
+    cache._remove(cache.path(address + '/data.csv'))
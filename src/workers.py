@@ -0,0 +1,112 @@
+from PyQt5.QtCore import QRunnable, pyqtSlot, QObject, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int)
+    status = pyqtSignal(bool)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    message = pyqtSignal(str)
+    partial = pyqtSignal(object)
+
+
+class Worker(QRunnable):
+    """ cancellable worker (thread), runs fn(*args, progress=..., cancelled=..., **kwargs)
+        and emits its return value as result """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        """ ask worker to stop, checked between chunks of work """
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    @pyqtSlot()
+    def run(self):
+        """ run thread worker """
+        from loader import CancelledError
+
+        self.signals.status.emit(True)
+        try:
+            result = self.fn(*self.args, progress=self.signals.progress.emit,
+                             cancelled=self.is_cancelled, **self.kwargs)
+        except CancelledError:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.status.emit(False)
+
+
+class CsvLoadWorker(Worker):
+    """ load csv file into data frame, args: file_name, sep, decimal, header, index,
+        kwargs: engine, compact, cache """
+
+    def __init__(self, *args, **kwargs):
+        import loader
+
+        super().__init__(loader.load_csv, *args, **kwargs)
+
+
+class CsvIndexWorker(Worker):
+    """ build index of rows for lazy loading, args: file_name, sep, decimal, header, index """
+
+    def __init__(self, *args, **kwargs):
+        from lazymodel import CsvSource
+
+        super().__init__(CsvSource, *args, **kwargs)
+
+
+class ExportWorker(Worker):
+    """ export data, args: file format (xlsx, sqlite, html, csv, md), file_name, chunks of data frame,
+        number of rows, kwargs: options of exporter """
+
+    def __init__(self, *args, **kwargs):
+        import export
+
+        super().__init__(export.run_export, *args, **kwargs)
+        self.kwargs['message'] = self.signals.message.emit
+
+
+class StatsWorker(Worker):
+    """ statistics of columns, args: data frame or chunks of data, column positions, number of rows,
+        accuracy; every finished column is emitted as partial result (position, Series) """
+
+    def __init__(self, *args, **kwargs):
+        import stats
+
+        super().__init__(stats.summarize, *args, **kwargs)
+        self.kwargs['column_done'] = self.signals.partial.emit
+
+
+class DownloadWorker(Worker):
+    """ download file from API, args: address, file_name, kwargs: options of dataload.download """
+
+    def __init__(self, *args, **kwargs):
+        import dataload
+
+        super().__init__(dataload.download, *args, **kwargs)
+        self.kwargs['message'] = self.signals.message.emit
+
+
+class ApiStreamWorker(Worker):
+    """ parse csv from API while it is downloaded, args: address, file name (optional copy),
+        kwargs: options of dataload.read_csv_stream; parsed chunks of rows are emitted as partial results """
+
+    def __init__(self, *args, **kwargs):
+        import dataload
+
+        super().__init__(dataload.read_csv_stream, *args, **kwargs)
+        self.kwargs['frame_ready'] = self.signals.partial.emit
+        self.kwargs['message'] = self.signals.message.emit